@@ -1,9 +1,10 @@
-
+import random
 
 class BaseBot():
-    def __init__(self, game):
+    def __init__(self, game, seed: int = None):
         self.game = game
         self.player = game.player
+        self.random = random.Random(seed) # luồng ngẫu nhiên riêng của bot, tách khỏi luồng sinh đạn của game
 
     def get_action(self) -> int:
         """
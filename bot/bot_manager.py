@@ -2,7 +2,7 @@ import numpy as np
 from configs.bot_config import (
     DodgeAlgorithm, DODGE_ALGORITHM,
     SCAN_RADIUS, USE_COMPLEX_SCANNING, BOT_ACTION, BOT_DRAW)
-from utils.draw_utils import draw_sector, draw_complex_sector
+from utils.draw_utils import draw_sector, blit_sectors, blit_complex_sectors
 from bot.heuristic_dodge import HeuristicDodgeBot
 from bot.deep_learning.param_input.numpy_agent import ParamNumpyAgent
 from bot.deep_learning.param_input.pytorch_agent import ParamTorchAgent
@@ -16,8 +16,8 @@ class BotManager:
         self.is_vision = False
         self.is_numpy = True
         
-    def create_bot(self, algorithm: DodgeAlgorithm = DODGE_ALGORITHM, load_saved_model: bool = False):
-        """Create a bot based on the specified dodge algorithm."""
+    def create_bot(self, algorithm: DodgeAlgorithm = DODGE_ALGORITHM, load_saved_model: bool = False, seed: int = None):
+        """Create a bot based on the specified dodge algorithm. `seed` seeds the bot's own random stream."""
         if algorithm in [
             DodgeAlgorithm.FURTHEST_SAFE_DIRECTION,
             DodgeAlgorithm.LEAST_DANGER_PATH,
@@ -25,19 +25,19 @@ class BotManager:
             DodgeAlgorithm.RANDOM_SAFE_ZONE,
             DodgeAlgorithm.OPPOSITE_THREAT_DIRECTION
         ]:
-            self.current_bot = HeuristicDodgeBot(self.game, algorithm)
+            self.current_bot = HeuristicDodgeBot(self.game, algorithm, seed)
             self.is_heuristic = True
         else:
             self.is_heuristic = False
             self.is_vision = False
             self.is_numpy = False
             if algorithm == DodgeAlgorithm.DL_PARAM_INPUT_NUMPY:
-                self.current_bot = ParamNumpyAgent(self.game, load_saved_model)
+                self.current_bot = ParamNumpyAgent(self.game, load_saved_model, seed)
                 self.is_numpy = True
             elif algorithm == DodgeAlgorithm.DL_PARAM_INPUT_TORCH:
-                self.current_bot = ParamTorchAgent(self.game, load_saved_model)
+                self.current_bot = ParamTorchAgent(self.game, load_saved_model, seed)
             elif algorithm == DodgeAlgorithm.DL_VISION_INPUT_NUMPY:
-                self.current_bot = VisionNumpyAgent(self.game, load_saved_model)
+                self.current_bot = VisionNumpyAgent(self.game, load_saved_model, seed)
                 self.is_vision = True
                 self.is_numpy = True
         return self.current_bot
@@ -57,7 +57,7 @@ class BotManager:
         surface = self.game.surface
         
         # Vẽ vòng tròn scan
-        player.draw_surround_circle(SCAN_RADIUS)
+        self.game.draw_surround_circle(SCAN_RADIUS)
         
         # Vẽ các sectors
         if USE_COMPLEX_SCANNING:
@@ -68,9 +68,9 @@ class BotManager:
         # Tô màu đạn trong vùng scan    
         self.game.bullet_manager.color_in_radius(SCAN_RADIUS, (128,0,128))
         
-        # Vẽ hướng di chuyển của bot
-        bot_direction = self.get_action()
-        if bot_direction:
+        # Vẽ hướng di chuyển của bot: quyết định đã áp dụng ở lần cập nhật vừa rồi, không hỏi lại bot
+        bot_direction = self.game.last_action
+        if bot_direction is not None:
             best_direction_index = np.argmax(bot_direction)
             if best_direction_index != 8:
                 draw_sector(surface, player.x, player.y, 
@@ -78,23 +78,16 @@ class BotManager:
 
     def _draw_simple_sectors(self, radius: int):
         """Vẽ các sector đơn giản (chỉ chia theo góc)"""
-        bullets_in_radius = self.game.bullet_manager.get_bullet_in_range(radius)
-        sector_flags = self.game.bullet_manager.get_simple_regions(bullets_in_radius)
-        
-        for i, has_bullet in enumerate(sector_flags):
-            if has_bullet:
-                draw_sector(self.game.surface, self.game.player.x, 
-                           self.game.player.y, radius, i, (255,255,0))
+        sector_flags = self.game.observe().simple_regions(radius)
+        # các sector có đạn: sprite vẽ sẵn, một lần blits
+        blit_sectors(self.game.surface, self.game.player.x, self.game.player.y,
+                     sector_flags, radius, (255,255,0))
 
     def _draw_complex_sectors(self, radius: int, num_angle_divisions: int = 8, 
                             num_radius_divisions: int = 3):
         """Vẽ các sector phức tạp (chia theo cả góc và bán kính)"""
-        bullets_in_radius = self.game.bullet_manager.get_bullet_in_range(radius)
-        sector_flags = self.game.bullet_manager.get_complex_regions(
-            bullets_in_radius, num_angle_divisions, num_radius_divisions)
-            
-        for i, has_bullet in enumerate(sector_flags):
-            if has_bullet:
-                draw_complex_sector(
-                    self.game.surface, self.game.player.x, self.game.player.y,
-                    i, radius, num_angle_divisions, num_radius_divisions, (255,255,0))
+        sector_flags = self.game.observe().complex_regions(radius, num_angle_divisions, num_radius_divisions)
+        # các ô có đạn: sprite vẽ sẵn, một lần blits
+        blit_complex_sectors(
+            self.game.surface, self.game.player.x, self.game.player.y,
+            sector_flags, radius, num_angle_divisions, num_radius_divisions, (255,255,0))
@@ -1,7 +1,8 @@
 import numpy as np
 import random
 from collections import deque
-from game.game_core import Game
+from configs.bot_config import ACTION_REPEAT
+from game.simulation import Simulation
 
 MAX_MEMORY = 100_000
 BATCH_SIZE = 1000
@@ -11,6 +12,7 @@ EPSILON = 1
 EPSILON_DECAY = 0.95
 MIN_EPSILON = 0.05
 STOP_ON_REWARD = 1000
+THROUGHPUT_REPORT_GAMES = 100  # train_vectorized: in throughput của các worker sau mỗi chừng ấy ván
 
 class BaseAgent:
     """
@@ -18,7 +20,15 @@ class BaseAgent:
     This class is designed to be inherited by specific agent implementations.
     """
 
-    def __init__(self, game: Game):
+    def __init__(self, game: Simulation, seed: int = None):
+        """
+        Args:
+            game: The game to play
+            seed: Seed of the agent's own random streams (exploration, memory sampling),
+                  independent of the game's bullet spawning stream
+        """
+        self.random = random.Random(seed)
+        self.np_random = np.random.default_rng(seed)
         self.number_of_games = 0
         self.memory = deque(maxlen=MAX_MEMORY)
         self.epsilon = EPSILON
@@ -27,6 +37,8 @@ class BaseAgent:
         self.trainer = None  # Placeholder for trainer, to be defined in subclasses
         self.game = game
         self.stop_on_reward = STOP_ON_REWARD
+        self.action_repeat = ACTION_REPEAT  # số lần cập nhật cho mỗi hành động (frame skip)
+        self.step_reward = None
 
     def set_mode(self, mode: str):
         """
@@ -50,16 +62,16 @@ class BaseAgent:
     
     def perform_action(self, action: np.ndarray, render: bool = True):
         """
-        Perform the given action in the game.
+        Perform the given action in the game for `action_repeat` updates (stops early on game over).
         """
-        self.game.take_action(action, render)
+        self.step_reward = self.game.take_action(action, render, self.action_repeat)
     
     def get_reward(self) -> tuple[float, bool]:
         """
-        Get the reward from the game.
+        Get the reward of the last performed action, summed over its `action_repeat` updates.
         Returns a tuple of (reward, game_over).
         """
-        return self.game.get_reward()
+        return self.step_reward if self.step_reward is not None else self.game.get_reward()
 
     def get_score(self) -> int:
         """
@@ -67,19 +79,28 @@ class BaseAgent:
         """
         return self.game.score
     
-    def restart_game(self):
-        self.game.restart_game()
+    def restart_game(self, seed: int = None):
+        self.game.restart_game(seed)
+        self.step_reward = None
         
     def draw_game(self):
         self.game.draw()
 
+    def report_throughput(self, vec_game):
+        """
+        Print the steps per second of each worker every THROUGHPUT_REPORT_GAMES finished games,
+        when `vec_game` is a SubprocVecGame (a VecGame has no workers to report).
+        """
+        if self.number_of_games % THROUGHPUT_REPORT_GAMES == 0 and hasattr(vec_game, "print_throughput"):
+            vec_game.print_throughput()
+
     def train_long_memory(self):
         if len(self.memory) <= BATCH_SIZE:
             # if have not saved over 1000 states yet
             mini_sample = self.memory
         else:
             # else pick random 1000 states to re-train
-            mini_sample = random.sample(self.memory, BATCH_SIZE)
+            mini_sample = self.random.sample(self.memory, BATCH_SIZE)
         for current_state, action, reward, next_state in mini_sample:
             self.train_short_memory(current_state, action, reward, next_state)
     
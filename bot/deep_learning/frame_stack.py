@@ -0,0 +1,62 @@
+import numpy as np
+
+class FrameStack:
+    """
+    The last `depth` frames of a vision agent, kept as uint8 in one preallocated ring.
+
+    Every frame gets a frame index (0, 1, 2, ... never reused). A stacked state is just the
+    index of its newest frame: `stack(index)` hands out the `depth` frames ending there as one
+    contiguous read-only view, so states can be stored in the replay memory as plain ints and
+    stacking copies nothing.
+
+    The ring holds `capacity` frames plus `depth - 1` mirror slots at its end: a frame written to
+    one of the last `depth - 1` slots is also written just before the first slot, so the window
+    of any frame never wraps around.
+    """
+
+    def __init__(self, frame_shape: tuple, depth: int, capacity: int):
+        """
+        Args:
+            frame_shape: Shape of one frame, e.g. (IMG_SIZE, IMG_SIZE)
+            depth: Number of consecutive frames in a state
+            capacity: Number of frames kept (stack(index) works for the last capacity - depth + 1 indices)
+        """
+        self.depth = depth
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity + depth - 1,) + tuple(frame_shape), dtype=np.uint8)
+        self.count = 0  # số frame đã ghi, cũng là index của frame kế tiếp
+
+    def slot(self, index: int) -> int:
+        return index % self.capacity + self.depth - 1
+
+    def next_frame(self) -> np.ndarray:
+        """Writable slot of the next frame: draw into it, then call `commit`."""
+        return self.buffer[self.slot(self.count)]
+
+    def commit(self) -> int:
+        """Publish the frame drawn into `next_frame()`. Returns its frame index."""
+        index = self.count
+        slot = self.slot(index)
+        if slot >= self.capacity:
+            self.buffer[slot - self.capacity] = self.buffer[slot]
+        self.count += 1
+        return index
+
+    def reset(self) -> int:
+        """Start a new episode: `depth - 1` blank frames, so the first states see nothing before their frame."""
+        for _ in range(self.depth - 1):
+            self.next_frame().fill(0)
+            self.commit()
+        return self.count - 1
+
+    def stack(self, index: int) -> np.ndarray:
+        """
+        Read-only view of the `depth` frames ending at frame `index`, oldest first,
+        shape (depth, *frame_shape). Copy it before the ring wraps if it has to be kept.
+        """
+        if not self.count - self.capacity + self.depth - 1 <= index < self.count:
+            raise IndexError(f"frame {index} is not in the ring any more (frames {self.count} written)")
+        end = self.slot(index) + 1
+        view = self.buffer[end - self.depth:end]
+        view.flags.writeable = False
+        return view
@@ -1,5 +1,19 @@
 import numpy as np
 import os
+from collections import namedtuple
+
+# input thưa (chỉ các phần tử khác 0) cho ảnh gần như toàn màu đen của agent vision
+SparseInput = namedtuple("SparseInput", ["indices", "values"])
+
+def sparse_input(input: np.ndarray, scale: float = 1.0) -> SparseInput:
+    """
+    The nonzero elements of a single input (any shape, read as one column), multiplied by `scale`.
+    Model.forward / target_forward / train accept it instead of the dense (n, 1) column:
+    the first layer then only touches the weight columns of those elements.
+    """
+    flat = input.reshape(-1)
+    indices = np.flatnonzero(flat != 0)  # so sánh trước: flatnonzero trên mảng bool nhanh hơn nhiều so với uint8
+    return SparseInput(indices, (flat[indices] * scale).reshape((-1, 1)))
 
 class Model:
 
@@ -28,31 +42,42 @@ class Model:
         self.target_weight_2= self.main_weight_2.copy()
         self.target_bias_2  = self.main_bias_2.copy()
 
-    def forward(self, input: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    def __first_layer(self, weight: np.ndarray, input: np.ndarray | SparseInput) -> np.ndarray:
+        if isinstance(input, SparseInput):
+            # chỉ các cột của weight ứng với phần tử khác 0: chi phí theo số phần tử khác 0, không theo kích thước input
+            return weight[:, input.indices].dot(input.values)
+        return weight.dot(input)
+
+    def forward(self, input: np.ndarray | SparseInput) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         # calculate values after every layer
-        raw_hidden_output   = self.main_weight_1.dot(input) + self.main_bias_1
+        raw_hidden_output   = self.__first_layer(self.main_weight_1, input) + self.main_bias_1
         act_hidden_output   = self.__ReLU(raw_hidden_output)
         raw_output          = self.main_weight_2.dot(act_hidden_output) + self.main_bias_2
         return raw_hidden_output, act_hidden_output, raw_output
     
-    def target_forward(self, input: np.ndarray) -> np.ndarray:
+    def target_forward(self, input: np.ndarray | SparseInput) -> np.ndarray:
         # calculate values after every layer
-        raw_hidden_output   = self.target_weight_1.dot(input) + self.target_bias_1
+        raw_hidden_output   = self.__first_layer(self.target_weight_1, input) + self.target_bias_1
         act_hidden_output   = self.__ReLU(raw_hidden_output)
         raw_output          = self.target_weight_2.dot(act_hidden_output) + self.target_bias_2
         return raw_output
     
-    def __backpropagation(self, model_raw_hidden_output: np.ndarray, model_act_hidden_output: np.ndarray, model_raw_output: np.ndarray, input: np.ndarray, expected_output: np.ndarray) -> None:
+    def __backpropagation(self, model_raw_hidden_output: np.ndarray, model_act_hidden_output: np.ndarray, model_raw_output: np.ndarray, input: np.ndarray | SparseInput, expected_output: np.ndarray) -> None:
         # calculate deltas
         loss                = model_raw_output - expected_output
         delta_weight_2      = 1 / loss.size * loss.dot(model_act_hidden_output.T)
         delta_bias_2        = (1 / loss.size) * np.sum(loss, axis=1, keepdims=True)
         delta_hidden        = self.main_weight_2.T.dot(loss) * self.__derivative_ReLU(model_raw_hidden_output)
-        delta_weight_1      = 1 / delta_hidden.size * delta_hidden.dot(input.T)
         delta_bias_1        = (1 / delta_hidden.size) * np.sum(delta_hidden, axis=1, keepdims=True)
 
         # update weight and bias
-        self.main_weight_1  = self.main_weight_1 - self.learning_rate * delta_weight_1
+        if isinstance(input, SparseInput):
+            # gradient của weight 1 bằng 0 ở các cột có input 0: chỉ cập nhật các cột khác 0
+            delta_weight_1  = 1 / delta_hidden.size * delta_hidden.dot(input.values.T)
+            self.main_weight_1[:, input.indices] -= self.learning_rate * delta_weight_1
+        else:
+            delta_weight_1  = 1 / delta_hidden.size * delta_hidden.dot(input.T)
+            self.main_weight_1  = self.main_weight_1 - self.learning_rate * delta_weight_1
         self.main_bias_1    = self.main_bias_1 - self.learning_rate * delta_bias_1
         self.main_weight_2  = self.main_weight_2 - self.learning_rate * delta_weight_2
         self.main_bias_2    = self.main_bias_2 - self.learning_rate * delta_bias_2
@@ -63,7 +88,7 @@ class Model:
     def __derivative_ReLU(self, weight: np.ndarray) -> np.ndarray:
         return weight > 0
     
-    def train(self, input: np.ndarray, expected_output: np.ndarray):
+    def train(self, input: np.ndarray | SparseInput, expected_output: np.ndarray):
         # train a single data / train short memory
         raw_hidden_output, act_hidden_output, raw_output = self.forward(input)
         self.__backpropagation(raw_hidden_output, act_hidden_output, raw_output, input, expected_output)
@@ -1,5 +1,4 @@
 import numpy as np
-import random
 
 if __name__ == "__main__":
     # only re-direct below if running this file
@@ -8,7 +7,9 @@ if __name__ == "__main__":
 
 from bot.deep_learning.models.numpy_model import Model
 from utils.bot_helper import plot_training_progress
-from game.game_core import Game
+from game.simulation import Simulation
+from game.vec_game import VecGame
+from game.state_encoder import STATE_SIZE
 from bot.deep_learning.base_agent import BaseAgent
 
 MAX_MEMORY = 100000
@@ -23,15 +24,15 @@ model_path = 'saved_model/param_numpy_model.npz'
 
 class ParamNumpyAgent(BaseAgent):
 
-    def __init__(self, game: Game, load_saved_model: bool = False):
-        super().__init__(game)
+    def __init__(self, game: Simulation, load_saved_model: bool = False, seed: int = None):
+        super().__init__(game, seed)
         self.epsilon = EPSILON
-        self.model = Model(28, 256, 9, LEARNING_RATE, model_path, load_saved_model)
+        self.model = Model(STATE_SIZE, 256, 9, LEARNING_RATE, model_path, load_saved_model)
         #warning: the number of neurals in first layer must match the size of game.get_state()
 
     def get_state(self) -> np.ndarray:
         """
-        Get the current game state and reshape it to 28x1 for model input
+        Get the current game state and reshape it to STATE_SIZE x 1 for model input
         example: array([1, 1, 0, 0, 0, 1, 0, ...0])
         """
         state = self.game.get_state(is_heuristic=False)
@@ -41,9 +42,9 @@ class ParamNumpyAgent(BaseAgent):
         action = np.zeros((9, ), dtype=np.float64)
         if self.mode == "train":
             # decise to take a random action or not
-            if random.random() < self.epsilon:
+            if self.random.random() < self.epsilon:
                 # if yes pick a random action
-                action[random.randint(0, 8)] = 1
+                action[self.random.randint(0, 8)] = 1
             else:
                 # if not model will predict the action
                 action[np.argmax(self.model.forward(state)[2])] = 1
@@ -52,6 +53,25 @@ class ParamNumpyAgent(BaseAgent):
             action[np.argmax(self.model.forward(state)[2])] = 1
         return action
 
+    def get_actions(self, states: np.ndarray) -> np.ndarray:
+        """
+        Batched get_action: one forward pass for every game of a VecGame.
+
+        Args:
+            states: shape (num_envs, STATE_SIZE)
+
+        Returns:
+            np.ndarray: one-hot actions, shape (num_envs, 9)
+        """
+        num_envs = len(states)
+        action_indices = np.argmax(self.model.forward(states.T)[2], axis=0)
+        if self.mode == "train":
+            explore = self.np_random.random(num_envs) < self.epsilon
+            action_indices[explore] = self.np_random.integers(0, 9, np.count_nonzero(explore))
+        actions = np.zeros((num_envs, 9), dtype=np.float64)
+        actions[np.arange(num_envs), action_indices] = 1
+        return actions
+
     def train_short_memory(self, current_state: np.ndarray, action: np.ndarray, reward: float, next_state: np.ndarray, game_over: bool):
         target = self.convert(current_state, action, reward, next_state, game_over)
         self.model.train(current_state, target)
@@ -62,7 +82,7 @@ class ParamNumpyAgent(BaseAgent):
             mini_sample = self.memory
         else:
             # else pick random 1000 states to re-train
-            mini_sample = random.sample(self.memory, MAX_SAMPLE_SIZE)
+            mini_sample = self.random.sample(self.memory, MAX_SAMPLE_SIZE)
         for current_state, action, reward, next_state, game_over in mini_sample:
             self.train_short_memory(current_state, action, reward, next_state, game_over)
 
@@ -78,6 +98,14 @@ class ParamNumpyAgent(BaseAgent):
             target[np.argmax(action)] = reward
         return target
     
+    def convert_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray, next_states: np.ndarray, dones: np.ndarray) -> np.ndarray:
+        """Batched convert: states are rows (num_envs, STATE_SIZE), the targets are columns (9, num_envs) like Model.forward."""
+        target = self.model.forward(states.T)[2]
+        Q_new = rewards + GAMMA * np.max(self.model.target_forward(next_states.T), axis=0)
+        Q_new = np.where(dones, rewards, np.clip(Q_new, -10000, 10000))
+        target[np.argmax(actions, axis=1), np.arange(len(states))] = Q_new
+        return target
+
     def train(self, render: bool = False):
         self.set_mode("train")
 
@@ -133,6 +161,52 @@ class ParamNumpyAgent(BaseAgent):
 
                 self.restart_game()
 
+    def train_vectorized(self, vec_game: VecGame):
+        """
+        Same training loop as `train`, but collects experience from every game of `vec_game`
+        (a VecGame or a SubprocVecGame) with one batched forward pass and one batched training step per update.
+        """
+        self.set_mode("train")
+
+        scores = []
+        mean_scores = []
+        sum = 0
+
+        current_states = vec_game.reset()
+        while True:
+            actions = self.get_actions(current_states)
+
+            # step every game, the finished ones are restarted by vec_game
+            next_states, rewards, dones = vec_game.step(actions)
+
+            self.model.train(current_states.T, self.convert_batch(current_states, actions, rewards, next_states, dones))
+
+            # copy: the states of a SubprocVecGame are views into its shared memory
+            for env in range(vec_game.num_envs):
+                self.remember(current_states[env].reshape(-1, 1).copy(), actions[env], rewards[env], next_states[env].reshape(-1, 1).copy(), dones[env])
+
+            if dones.any():
+                for env in np.flatnonzero(dones).tolist():
+                    self.epsilon = max(self.epsilon * EPSILON_DECAY, MIN_EPSILON)
+                    self.number_of_games += 1
+                    self.report_throughput(vec_game)
+
+                    if self.number_of_games % 10 == 0:
+                        if self.number_of_games % 250 == 0:
+                            self.model.update_target_net()
+                        self.model.save()
+
+                    score = int(vec_game.episode_scores[env])
+                    sum += score
+                    mean_scores.append(sum / self.number_of_games)
+                    scores.append(score)
+
+                # one long memory pass per step, not per finished game
+                self.train_long_memory()
+                plot_training_progress(scores, mean_scores)
+
+            current_states = next_states
+
     def perform(self, render: bool = True):
         self.set_mode("perform")
         
@@ -155,18 +229,31 @@ class ParamNumpyAgent(BaseAgent):
             if game_over:
                 self.restart_game()
 
-            # use pygame to control FPS and UPS
-            self.game.clock.tick(60)
+            # use pygame to control UPS (no wait in unbounded simulation rate)
+            self.game.tick_clock(self.action_repeat)
     
     def load_model(self):
         self.model.load()
 
 if __name__ == '__main__':
-    agent = ParamNumpyAgent(Game())
+    from game.game_core import Game
 
     mode = "train"
-
-    if mode == "train":
+    num_envs = 1    # > 1: train on a VecGame of num_envs games
+    num_workers = 0 # > 0: spread the num_envs games over worker processes (SubprocVecGame)
+    action_repeat = 1 # > 1: keep each action for that many updates (frame skip), single-game training and perform
+
+    # train headless (no window), watch the trained bot in the pygame Game
+    agent = ParamNumpyAgent(Simulation() if mode == "train" else Game())
+    agent.action_repeat = action_repeat
+
+    if mode == "train" and num_workers > 0:
+        from game.subproc_vec_game import SubprocVecGame
+        with SubprocVecGame(num_workers, max(num_envs // num_workers, 1)) as vec_game:
+            agent.train_vectorized(vec_game)
+    elif mode == "train" and num_envs > 1:
+        agent.train_vectorized(VecGame(num_envs))
+    elif mode == "train":
         agent.train()
     elif mode == "perform":
         agent.perform()
\ No newline at end of file
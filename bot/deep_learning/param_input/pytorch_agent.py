@@ -1,5 +1,4 @@
 import torch
-import random
 import itertools
 import numpy as np
 
@@ -8,7 +7,9 @@ if __name__ == "__main__":
     import sys, os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
-from game.game_core import Game
+from game.simulation import Simulation
+from game.vec_game import VecGame
+from game.state_encoder import STATE_SIZE
 from bot.deep_learning.base_agent import BaseAgent
 from bot.deep_learning.models.pytorch_model import Linear_QNet, QTrainer
 from bot.heuristic_dodge import HeuristicDodgeBot
@@ -31,22 +32,22 @@ model_path = 'saved_model/param_pytorch_model.pth'
 
 class ParamTorchAgent(BaseAgent):
 
-    def __init__(self, game: Game, load_saved_model: bool = False):
-        super().__init__(game)
+    def __init__(self, game: Simulation, load_saved_model: bool = False, seed: int = None):
+        super().__init__(game, seed)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
         self.policy_net = Linear_QNet(
-            28, 9, model_path=model_path, load_saved_model=load_saved_model
+            STATE_SIZE, 9, model_path=model_path, load_saved_model=load_saved_model
             ).to(self.device)
         #warning: the number of neurals in first layer must match the size of game.get_state()
         
-        self.target_net = Linear_QNet(28, 9, load_saved_model=False).to(self.device)
+        self.target_net = Linear_QNet(STATE_SIZE, 9, load_saved_model=False).to(self.device)
         self.target_net.load_state_dict(self.policy_net.state_dict()) # Load the weights from policy_net to target_net
         
         self.trainer = QTrainer(self.policy_net, lr=LEARNING_RATE, gamma=GAMMA)
         self.network_update_freq = NETWORK_UPDATE_FREQ # Update target network every 1000 steps
         
-        self.heuristic_bot = HeuristicDodgeBot(game, HEURISTIC_METHOD)
+        self.heuristic_bot = HeuristicDodgeBot(game, HEURISTIC_METHOD, seed)
         self.imitation_prob = IMITATION_PROBABILITY
         
     def train(self, render: bool = False) -> None:
@@ -130,6 +131,53 @@ class ParamTorchAgent(BaseAgent):
             plot_training_progress(scores_per_episode)
             self.epsilon = max(MIN_EPSILON, self.epsilon * EPSILON_DECAY)
     
+    def train_vectorized(self, vec_game: VecGame) -> None:
+        """
+        Collect experience from every game of `vec_game` (a VecGame or a SubprocVecGame)
+        with one batched forward pass per step.
+        Heuristic imitation is not used here: the heuristic bot only sees `self.game`.
+        """
+        self.set_mode("train")
+        scores_per_episode = []
+        best_score = 0
+        step_count = 0
+
+        current_states = vec_game.reset()
+        while True:
+            actions = self.get_actions(current_states)
+            next_states, rewards, dones = vec_game.step(actions)
+
+            states_tensor = torch.as_tensor(current_states, dtype=torch.float, device=self.device)
+            actions_tensor = torch.as_tensor(actions, dtype=torch.float, device=self.device)
+            rewards_tensor = torch.as_tensor(rewards, dtype=torch.float, device=self.device)
+            next_states_tensor = torch.as_tensor(next_states, dtype=torch.float, device=self.device)
+            for env in range(vec_game.num_envs):
+                self.remember(
+                    states_tensor[env], actions_tensor[env], rewards_tensor[env],
+                    next_states_tensor[env], bool(dones[env]))
+            step_count += vec_game.num_envs
+
+            if dones.any():
+                for env in np.flatnonzero(dones).tolist():
+                    self.number_of_games += 1
+                    self.report_throughput(vec_game)
+                    score = int(vec_game.episode_scores[env])
+                    scores_per_episode.append(score)
+                    if score > best_score:
+                        best_score = score
+                        self.policy_net.save()
+                    self.epsilon = max(MIN_EPSILON, self.epsilon * EPSILON_DECAY)
+
+                self.train_long_memory()
+                plot_training_progress(scores_per_episode)
+
+            if step_count >= self.network_update_freq:
+                # update target network
+                self.target_net.load_state_dict(self.policy_net.state_dict())
+                step_count = 0
+
+            current_states = next_states
+
     def perform(self, render: bool = True):
         """
         Use trained model to play game
@@ -147,7 +195,7 @@ class ParamTorchAgent(BaseAgent):
         # Game loop
         while True:
             # Get current state
-            self.game.clock.tick(60)
+            self.game.tick_clock(self.action_repeat)
             current_state = self.get_state()
             
             # Get action from model
@@ -173,12 +221,12 @@ class ParamTorchAgent(BaseAgent):
         # random moves: tradeoff exploration / exploitation
         if self.mode == "train":
             # decise to take a random move or not
-            if random.random() < self.epsilon:
-                if random.random() < self.imitation_prob:
+            if self.random.random() < self.epsilon:
+                if self.random.random() < self.imitation_prob:
                     action = self.heuristic_bot.get_action(self.game.get_state(is_heuristic=True))
                 else:
                     # if yes pick a random move
-                    action[random.randint(0, 8)] = 1
+                    action[self.random.randint(0, 8)] = 1
             else:
                 # if not model will predict the move
                 with torch.no_grad(): # eliminate gradient calculation
@@ -191,11 +239,32 @@ class ParamTorchAgent(BaseAgent):
                 action[predicted_idx] = 1
         return action
 
+    def get_actions(self, states: np.ndarray) -> np.ndarray:
+        """
+        Batched get_action for a VecGame: one policy_net forward for every game.
+
+        Args:
+            states: shape (num_envs, STATE_SIZE)
+
+        Returns:
+            np.ndarray: one-hot actions, shape (num_envs, 9)
+        """
+        num_envs = len(states)
+        with torch.no_grad(): # eliminate gradient calculation
+            states_tensor = torch.as_tensor(states, dtype=torch.float, device=self.device)
+            action_indices = self.policy_net(states_tensor).argmax(dim=1).cpu().numpy()
+        if self.mode == "train":
+            explore = self.np_random.random(num_envs) < self.epsilon
+            action_indices[explore] = self.np_random.integers(0, 9, np.count_nonzero(explore))
+        actions = np.zeros((num_envs, 9), dtype=np.float32)
+        actions[np.arange(num_envs), action_indices] = 1
+        return actions
+
     def train_long_memory(self):
         if len(self.memory) < BATCH_SIZE:
             return
         
-        mini_sample = random.sample(self.memory, BATCH_SIZE) # list of tuples
+        mini_sample = self.random.sample(self.memory, BATCH_SIZE) # list of tuples
         self.trainer.optimize(mini_sample, self.policy_net, self.target_net, GAMMA)
 
     def train_short_memory(self, state, action, reward, next_state, done):
@@ -211,6 +280,18 @@ class ParamTorchAgent(BaseAgent):
             self.policy_net.eval()
 
 if __name__ == '__main__':
-    game = Game()
+    # train headless (no window)
+    num_envs = 1    # > 1: train on a VecGame of num_envs games
+    num_workers = 0 # > 0: spread the num_envs games over worker processes (SubprocVecGame)
+    action_repeat = 1 # > 1: keep each action for that many updates (frame skip), single-game training
+    game = Simulation()
     agent = ParamTorchAgent(game)
-    agent.train()
\ No newline at end of file
+    agent.action_repeat = action_repeat
+    if num_workers > 0:
+        from game.subproc_vec_game import SubprocVecGame
+        with SubprocVecGame(num_workers, max(num_envs // num_workers, 1)) as vec_game:
+            agent.train_vectorized(vec_game)
+    elif num_envs > 1:
+        agent.train_vectorized(VecGame(num_envs))
+    else:
+        agent.train()
\ No newline at end of file
@@ -1,12 +1,15 @@
 if __name__ == "__main__":
     import sys, os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
-from bot.deep_learning.models.numpy_model import Model
-from utils.bot_helper import plot_training_progress, get_screen_shot_gray_scale, show_numpy_to_image
+from bot.deep_learning.models.numpy_model import Model, SparseInput, sparse_input
+from utils.bot_helper import plot_training_progress, show_numpy_to_image
 from bot.deep_learning.base_agent import BaseAgent
-from game.game_core import Game
+from bot.deep_learning.frame_stack import FrameStack
+from configs.bot_config import FRAME_STACK_DEPTH
+from game.simulation import Simulation
+from game.rasterizer import Rasterizer
 import numpy as np
-import random
+from collections import deque
 
 MAX_MEMORY = 10000
 MAX_SAMPLE_SIZE = 1000
@@ -21,44 +24,56 @@ IMG_SIZE = 50 # 50 x 50 pixel^2
 model_path = 'saved_model/vision_numpy_model.npz'
 
 class VisionNumpyAgent(BaseAgent):
-    def __init__(self, game: Game, load_saved_model: bool = False):
-        super().__init__(game)
+    def __init__(self, game: Simulation, load_saved_model: bool = False, seed: int = None):
+        super().__init__(game, seed)
         self.epsillon = EPSILON
-        self.model = Model((IMG_SIZE ** 2) * 2, 9, 9, LEARNING_RATE, model_path, load_saved_model) #warning: the number of neurals in first layer must match the size of game.get_state()
+        self.model = Model((IMG_SIZE ** 2) * FRAME_STACK_DEPTH, 9, 9, LEARNING_RATE, model_path, load_saved_model) #warning: the number of neurals in first layer must match the size of game.get_state()
+        self.rasterizer = Rasterizer(IMG_SIZE)
+        # replay memory riêng: state chỉ là index frame, ring phải giữ được frame của mọi transition trong memory
+        self.memory = deque(maxlen=MAX_MEMORY)
+        # mỗi transition thêm nhiều nhất FRAME_STACK_DEPTH frame (1 frame + frame trống khi reset)
+        self.frames = FrameStack((IMG_SIZE, IMG_SIZE), FRAME_STACK_DEPTH, (self.memory.maxlen + 2) * FRAME_STACK_DEPTH)
         self.reset_self_img()
 
     def reset_self_img(self):
-        self.img_01 = np.zeros((IMG_SIZE ** 2, 1), dtype=np.float64)
-        self.img_02 = np.zeros((IMG_SIZE ** 2, 1), dtype=np.float64)
-
-    def get_state(self) -> np.ndarray: # get game state. stack of two consecutive screenshot around player
-        self.img_02 = get_screen_shot_gray_scale(self.game.player.x, self.game.player.y, IMG_SIZE)
-        state = np.concatenate((self.img_01, self.img_02), axis=0)
-        self.img_01 = self.img_02
-        return state
-
-    def get_action(self, state: np.ndarray) -> np.ndarray:
+        self.frame_index = self.frames.reset()
+        self.frame_tick = None
+
+    def get_state(self) -> int: # get game state: index of the newest of FRAME_STACK_DEPTH consecutive images around player
+        if self.frame_tick != self.game.update_counter:
+            # vẽ headless thẳng vào ring, mỗi tick một frame
+            self.rasterizer.render(self.game, out=self.frames.next_frame())
+            self.frame_index = self.frames.commit()
+            self.frame_tick = self.game.update_counter
+        return self.frame_index
+
+    def model_input(self, state: int) -> SparseInput:
+        """The stacked frames of `state` as the model's input, 0-1 floats, only the lit pixels (mostly black image)."""
+        return sparse_input(self.frames.stack(state), 1 / 255.0)
+
+    def get_action(self, state: int) -> np.ndarray:
         move = np.zeros((9, ), dtype=np.float64)
         if self.mode == "train":
             # decise to take a random move or not
-            if random.random() < self.epsillon:
+            if self.random.random() < self.epsillon:
                 # if yes pick a random move
-                move[random.randint(0, 8)] = 1
+                move[self.random.randint(0, 8)] = 1
             else:
                 # if not model will predict the move
-                move[np.argmax(self.model.forward(state)[2])] = 1
+                move[np.argmax(self.model.forward(self.model_input(state))[2])] = 1
         elif self.mode == "perform":
             # always use model to predict move in pridict move / always predict
-            move[np.argmax(self.model.forward(state)[2])] = 1
+            move[np.argmax(self.model.forward(self.model_input(state))[2])] = 1
         return move
     
-    def restart_game(self):
-        self.game.restart_game()
+    def restart_game(self, seed: int = None):
+        super().restart_game(seed)
         self.reset_self_img()
 
-    def train_short_memory(self, current_state: np.ndarray, action: np.ndarray, reward: float, next_state: np.ndarray, game_over: bool):
-        target = self.convert(current_state, action, reward, next_state, game_over)
-        self.model.train(current_state, target)
+    def train_short_memory(self, current_state: int, action: np.ndarray, reward: float, next_state: int, game_over: bool):
+        current_input = self.model_input(current_state)
+        target = self.convert(current_input, action, reward, self.model_input(next_state), game_over)
+        self.model.train(current_input, target)
 
     def train_long_memory(self):
         if len(self.memory) <= MAX_SAMPLE_SIZE:
@@ -66,7 +81,7 @@ class VisionNumpyAgent(BaseAgent):
             mini_sample = self.memory
         else:
             # else pick random 1000 states to re-train
-            mini_sample = random.sample(self.memory, MAX_SAMPLE_SIZE)
+            mini_sample = self.random.sample(self.memory, MAX_SAMPLE_SIZE)
         for current_state, action, reward, next_state, game_over in mini_sample:
             self.train_short_memory(current_state, action, reward, next_state, game_over)
 
@@ -93,8 +108,9 @@ class VisionNumpyAgent(BaseAgent):
             # get the current game state
             current_state = self.get_state()
 
-            # optional (on or off by comment or not the next line): show what the AI see in real-time
-            show_numpy_to_image(self.img_02, IMG_SIZE)
+            # show what the AI see in real-time (needs a display)
+            if render:
+                show_numpy_to_image(self.frames.stack(current_state)[-1] / 255.0, IMG_SIZE)
 
             # get the move based on the state
             action = self.get_action(current_state)
@@ -160,17 +176,22 @@ class VisionNumpyAgent(BaseAgent):
             if game_over:
                 self.restart_game()
 
-            # use pygame to control FPS and UPS
-            self.game.clock.tick(60)
+            # use pygame to control UPS (no wait in unbounded simulation rate)
+            self.game.tick_clock(self.action_repeat)
             
     def load_model(self):
         self.model.load()
 
 if __name__ == '__main__':
-    agent = VisionNumpyAgent(Game())
+    from game.game_core import Game
+
     mode = "train"
+    render = False  # True: train in the pygame window and show what the AI sees
+    # the agent draws its own input, so training does not need a window
+    agent = VisionNumpyAgent(Game() if mode == "perform" or render else Simulation())
+    agent.action_repeat = 1 # > 1: giữ mỗi hành động qua nhiều lần cập nhật (frame skip)
 
     if mode == "train":
-        agent.train()
+        agent.train(render)
     elif mode == "perform":
         agent.perform()
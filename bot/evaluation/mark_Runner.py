@@ -9,16 +9,23 @@ project_root = '/content/AI-project'
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from game.game_core import Game
+from game.simulation import Simulation
+from game.bullet_timeline import BulletTimeline
 from bot.bot_manager import BotManager
 from configs.bot_config import DodgeAlgorithm
 
+# True: sinh màn đạn của mỗi episode một lần rồi phát lại cho mọi thuật toán
+USE_BULLET_TIMELINES = True
 
-def run_single_episode(algorithm, episode_index):
-    game = Game()
-    game.restart_game()
+
+def run_single_episode(algorithm, episode_index, timeline: BulletTimeline = None):
+    # headless: không mở cửa sổ pygame trong các worker
+    game = Simulation()
+    game.bullet_manager.set_timeline(timeline)
+    # episode i dùng cùng seed cho mọi thuật toán: các bot gặp đúng cùng một màn đạn (so sánh theo cặp)
+    game.restart_game(seed=episode_index)
     bot_manager = BotManager(game)
-    bot_manager.create_bot(algorithm, load_saved_model=True)
+    bot_manager.create_bot(algorithm, load_saved_model=True, seed=episode_index)
 
     if not bot_manager.is_heuristic:
         bot_manager.current_bot.set_mode("perform")
@@ -27,7 +34,10 @@ def run_single_episode(algorithm, episode_index):
     game_over = False
 
     while not game_over:
-        state = game.get_state(bot_manager.is_heuristic, bot_manager.is_vision, bot_manager.is_numpy)
+        if bot_manager.is_heuristic:
+            state = game.get_state(is_heuristic=True)
+        else:
+            state = bot_manager.current_bot.get_state()
         action = bot_manager.current_bot.get_action(state)
         game.update(action)
         reward, game_over = game.get_reward()
@@ -42,9 +52,9 @@ def run_single_episode(algorithm, episode_index):
     }
 
 
-def run_benchmark_parallel(algorithm, num_episodes=20, num_workers=4):
+def run_benchmark_parallel(algorithm, num_episodes=20, num_workers=4, timelines: list[BulletTimeline] = None):
     pool = multiprocessing.Pool(processes=num_workers)
-    args = [(algorithm, i) for i in range(num_episodes)]
+    args = [(algorithm, i, timelines[i] if timelines else None) for i in range(num_episodes)]
     results = pool.starmap(run_single_episode, args)
     pool.close()
     pool.join()
@@ -100,6 +110,9 @@ def save_results(df, base_path="/content/drive/MyDrive/game_ai"):
 if __name__ == "__main__":
     all_results = []
 
+    # episode i của mọi thuật toán phát lại cùng timeline (seed i)
+    timelines = [BulletTimeline(seed) for seed in range(20)] if USE_BULLET_TIMELINES else None
+
     heuristic_algorithms = [
         DodgeAlgorithm.FURTHEST_SAFE_DIRECTION,
         DodgeAlgorithm.LEAST_DANGER_PATH,
@@ -110,7 +123,7 @@ if __name__ == "__main__":
 
     for alg in heuristic_algorithms:
         print(f"\n=== Benchmarking Heuristic Bot: {alg.name} ===")
-        results = run_benchmark_parallel(alg, num_episodes=20, num_workers=4)
+        results = run_benchmark_parallel(alg, num_episodes=20, num_workers=4, timelines=timelines)
         all_results.extend(results)
 
 
@@ -122,7 +135,7 @@ if __name__ == "__main__":
 
     for alg in dl_algorithms:
         print(f"\n=== Benchmarking Deep Learning Bot: {alg.name} ===")
-        results = run_benchmark_parallel(alg, num_episodes=10, num_workers=4)
+        results = run_benchmark_parallel(alg, num_episodes=10, num_workers=4, timelines=timelines)
         all_results.extend(results)
         
 
@@ -1,25 +1,24 @@
-import math, random
+import math
 import numpy as np
-import pygame
 from configs.bot_config import (
     DodgeAlgorithm, FILTER_MOVE_INTO_WALL, SCAN_RADIUS, USE_COMPLEX_SCANNING,
     USE_WALL_PENALTY, WALL_PENALTY_BIAS, WALL_MARGIN)
 from configs.game_config import BOX_LEFT, BOX_SIZE, BOX_TOP
-from utils.draw_utils import draw_sector, draw_complex_sector
+from utils.draw_utils import draw_sector, blit_sectors, blit_complex_sectors
 from bot.base_bot import BaseBot
-from game.game_core import Game
+from game.simulation import Simulation
 
 class HeuristicDodgeBot(BaseBot):
-    def __init__(self, game: "Game", method = DodgeAlgorithm.LEAST_DANGER_PATH_ADVANCED):
-        super().__init__(game)
+    def __init__(self, game: "Simulation", method = DodgeAlgorithm.LEAST_DANGER_PATH_ADVANCED, seed: int = None):
+        super().__init__(game, seed)
         self.method = method
         self.game = game
-        self.surface = game.surface
+        self.surface = getattr(game, "surface", None) # None khi chạy headless (Simulation)
         # Hành động: 8 hướng + đứng yên (index 8)
         self.action = np.array([0,0,0,0,0,0,0,0,1])
         
-    def get_action(self, state: list) -> np.ndarray:
-        # state: list bullet in SCAN_RADIUS
+    def get_action(self, state: np.ndarray) -> np.ndarray:
+        # state: indices of the bullets in SCAN_RADIUS
         self.reset_action()
 
         if len(state) == 0:
@@ -30,8 +29,9 @@ class HeuristicDodgeBot(BaseBot):
             DodgeAlgorithm.FURTHEST_SAFE_DIRECTION: self.furthest_safe,
             DodgeAlgorithm.LEAST_DANGER_PATH: self.least_danger,
             DodgeAlgorithm.LEAST_DANGER_PATH_ADVANCED: self.least_danger_advanced,
-            DodgeAlgorithm.RANDOM_SAFE_ZONE: self.random_move,
-            DodgeAlgorithm.OPPOSITE_THREAT_DIRECTION: self.opposite_threat
+            # cờ 8 hướng của các viên trong SCAN_RADIUS lấy sẵn từ observation của tick
+            DodgeAlgorithm.RANDOM_SAFE_ZONE: lambda bullets: self.random_move(bullets, self.game.observe().simple_regions()),
+            DodgeAlgorithm.OPPOSITE_THREAT_DIRECTION: lambda bullets: self.opposite_threat(bullets, self.game.observe().simple_regions())
         }
         
         # Lấy hàm xử lý né đạn dựa trên self.method từ method_map.
@@ -46,13 +46,12 @@ class HeuristicDodgeBot(BaseBot):
         return self.action
 
     def furthest_safe(self, bullets_near_player):
+        bullets = self.game.bullet_manager.bullets
+        bullet_x, bullet_y = bullets.x[bullets_near_player], bullets.y[bullets_near_player]
         safe_scores = []
         for direction in self.player.directions:
             new_pos = self.player.direction_to_position(direction)
-            safe_score = sum(
-                (new_pos.x - bullet.x) ** 2 + (new_pos.y - bullet.y) ** 2
-                for bullet in bullets_near_player
-            )
+            safe_score = float(np.sum((new_pos.x - bullet_x) ** 2 + (new_pos.y - bullet_y) ** 2))
             safe_scores.append(safe_score)
             
         if USE_WALL_PENALTY:
@@ -65,13 +64,12 @@ class HeuristicDodgeBot(BaseBot):
         return best_direction_index
 
     def least_danger(self, bullets_near_player):
+        bullets = self.game.bullet_manager.bullets
+        bullet_x, bullet_y = bullets.x[bullets_near_player], bullets.y[bullets_near_player]
         danger_scores = []
         for direction in self.player.directions:
             new_pos = self.player.direction_to_position(direction)
-            danger_score = sum(
-                1 / ((new_pos.x - bullet.x) ** 2 + (new_pos.y - bullet.y) ** 2 + 1)
-                for bullet in bullets_near_player
-            )
+            danger_score = float(np.sum(1 / ((new_pos.x - bullet_x) ** 2 + (new_pos.y - bullet_y) ** 2 + 1)))
             danger_scores.append(danger_score)
             
         if USE_WALL_PENALTY:
@@ -91,7 +89,7 @@ class HeuristicDodgeBot(BaseBot):
             (SCAN_RADIUS/2, SCAN_RADIUS, 5),
         ]
         for (start_r, end_r, ticks) in zones:
-            bullets_zone = self.game.bullet_manager.get_bullet_in_range(end_r, start_r)
+            bullets_zone = self.game.observe().bullets_in_range(end_r, start_r)
             partial_scores = self.predict_future_danger(bullets_zone, future_ticks=ticks)
             for i in range(9):
                 danger_scores[i] += partial_scores[i]
@@ -105,30 +103,36 @@ class HeuristicDodgeBot(BaseBot):
         return danger_scores.index(min(danger_scores))
 
     def predict_future_danger(self, bullets_near_player, future_ticks=10) -> list[float]:
+        # delta_time=1: mỗi "tick" ở đây là vận tốc px/s nhân 1 (tầm nhìn đã được tinh chỉnh theo cách này);
+        # với tầm nhìn xa như vậy, đạn nảy đi thẳng ra ngoài cho kết quả né tốt hơn là phản xạ lại vào sân.
+        # Cờ alive bị bỏ qua: ở tầm nhìn ~750 px gần như mọi viên đều đã ra khỏi màn hình, nhưng điểm
+        # nguy hiểm được tinh chỉnh với cả các vị trí đó
+        future_x, future_y, _ = self.game.bullet_manager.bullets.positions_at(
+            future_ticks, bullets_near_player, delta_time=1.0, bounce=False)
         danger_scores = []
         for direction in self.player.directions:
             new_pos = self.player.direction_to_position(direction)
-            danger_score = sum(
-                1 / ((new_pos.x - (bullet.x + future_ticks * math.cos(bullet.angle) * bullet.speed)) ** 2 +
-                     (new_pos.y - (bullet.y + future_ticks * math.sin(bullet.angle) * bullet.speed)) ** 2 + 1)
-                for bullet in bullets_near_player
-            )
+            danger_score = float(np.sum(1 / ((new_pos.x - future_x) ** 2 + (new_pos.y - future_y) ** 2 + 1)))
             danger_scores.append(danger_score)
         return danger_scores
     
-    def opposite_threat(self, bullets_near_player):
-        sector_flags = self.classify_bullets_into_sectors(bullets_near_player)
+    def opposite_threat(self, bullets_near_player, sector_flags: np.ndarray = None):
+        """`sector_flags`: the 8 direction flags of `bullets_near_player` if already known (computed otherwise)."""
+        if sector_flags is None:
+            sector_flags = self.classify_bullets_into_sectors(bullets_near_player)
         vertical_threat = sector_flags[5] + sector_flags[6] + sector_flags[7] - (sector_flags[1] + sector_flags[2] + sector_flags[3])
         horizontal_threat = sector_flags[7] + sector_flags[0] + sector_flags[1] - (sector_flags[3] + sector_flags[4] + sector_flags[5])
         move_y = -1 if vertical_threat > 0 else (1 if vertical_threat < 0 else 0)
         move_x = -1 if horizontal_threat > 0 else (1 if horizontal_threat < 0 else 0)
-        best_direction_index = self.game.player.directions.index(pygame.Vector2(move_x, move_y))
+        best_direction_index = self.game.player.directions.index((move_x, move_y))
         return best_direction_index
 
-    def random_move(self, bullets_near_player):
-        sector_flags = self.classify_bullets_into_sectors(bullets_near_player)
+    def random_move(self, bullets_near_player, sector_flags: np.ndarray = None):
+        """`sector_flags`: the 8 direction flags of `bullets_near_player` if already known (computed otherwise)."""
+        if sector_flags is None:
+            sector_flags = self.classify_bullets_into_sectors(bullets_near_player)
         safe_dirs = [i for i, flag in enumerate(sector_flags) if not flag]
-        return random.choice(safe_dirs) if safe_dirs else 8
+        return self.random.choice(safe_dirs) if safe_dirs else 8
 
     def apply_soft_wall_penalty(self, danger_scores, margin=WALL_MARGIN):
         for i, direction in enumerate(self.player.directions):
@@ -160,10 +164,11 @@ class HeuristicDodgeBot(BaseBot):
     def classify_bullets_into_sectors(self, bullets, num_sectors=8, start_angle=-math.pi/8) -> np.ndarray:
         sector_flags = np.zeros(num_sectors)
         sector_angle = 2 * math.pi / num_sectors
+        store = self.game.bullet_manager.bullets
 
-        for bullet in bullets:
+        for bullet_x, bullet_y in zip(store.x[bullets].tolist(), store.y[bullets].tolist()):
             # Tính góc của viên đạn so với nhân vật
-            angle = math.atan2(self.player.y - bullet.y, bullet.x - self.player.x)
+            angle = math.atan2(self.player.y - bullet_y, bullet_x - self.player.x)
             # Chỉnh lại góc về phạm vi [0, 360)
             angle = (angle - start_angle) % (2 * math.pi)
             # Xác định nan quạt nào chứa viên đạn
@@ -173,7 +178,7 @@ class HeuristicDodgeBot(BaseBot):
         return sector_flags
     
     def draw_vision(self):
-        self.player.draw_surround_circle(SCAN_RADIUS)
+        self.game.draw_surround_circle(SCAN_RADIUS)
         if USE_COMPLEX_SCANNING:
             self.draw_complex_sectors(SCAN_RADIUS)
         else:
@@ -185,27 +190,18 @@ class HeuristicDodgeBot(BaseBot):
     
     def draw_simple_sectors(self, radius: int):
         """Vẽ các sector đơn giản (chỉ chia theo góc)"""
-        bullets_in_radius = self.game.bullet_manager.get_bullet_in_range(radius)
-        sector_flags = self.game.bullet_manager.get_simple_regions(bullets_in_radius)
-        num_sectors = len(sector_flags)
-        for i in range(num_sectors):
-            # Chọn màu: Vàng nếu có đạn, Trắng nếu không
-            color = (255,255,0) if sector_flags[i] else (255,255,255)
-            if sector_flags[i]:
-                draw_sector(
-                    self.surface, self.player.x, self.player.y,
-                    radius, i, color, num_sectors)
+        sector_flags = self.game.observe().simple_regions(radius)
+        # chỉ vẽ các sector có đạn (màu vàng), sprite vẽ sẵn, một lần blits
+        blit_sectors(self.surface, self.player.x, self.player.y,
+                     sector_flags, radius, (255,255,0), len(sector_flags))
     
     def draw_complex_sectors(self, radius: int, num_angle_divisions: int = 8, num_radius_divisions: int = 3):
         """Vẽ các sector phức tạp (chia theo cả góc và bán kính)"""
-        bullets_in_radius = self.game.bullet_manager.get_bullet_in_range(radius)
-        sector_flags = self.game.bullet_manager.get_complex_regions(bullets_in_radius, num_angle_divisions, num_radius_divisions)
-        for i in range(len(sector_flags)):
-            color = (255,255,0) if sector_flags[i] else (255,255,255)
-            if sector_flags[i]:
-                draw_complex_sector(
-                    self.surface, self.player.x, self.player.y, i,
-                    radius, num_angle_divisions, num_radius_divisions, color)
+        sector_flags = self.game.observe().complex_regions(radius, num_angle_divisions, num_radius_divisions)
+        # chỉ vẽ các ô có đạn (màu vàng), sprite vẽ sẵn, một lần blits
+        blit_complex_sectors(
+            self.surface, self.player.x, self.player.y, sector_flags,
+            radius, num_angle_divisions, num_radius_divisions, (255,255,0))
 
     def reset_action(self):
         self.action[:] = 0
@@ -168,7 +168,7 @@ class Supervised_Agent:
                 print("Game:", self.number_of_games,"Score:", self.get_score())
                 self.reset_game()
 
-            self.game.clock.tick(60)
+            self.game.tick_clock()
 
     def bench(self):
         # manually used to find the best multiple
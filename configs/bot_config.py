@@ -26,6 +26,10 @@ WALL_MARGIN = 30                # Khoảng cách từ tường bắt đầu tín
 
 USE_COMPLEX_SCANNING = True
 SCAN_RADIUS = 100
+USE_NEAREST_BULLETS_STATE = False  # True: get_state mô tả K viên đạn gần nhất (vị trí, vận tốc) thay cho các cờ vùng
+NUM_NEAREST_BULLETS = 8            # K, kích thước state = K * 5 + 4
 DODGE_ALGORITHM = DodgeAlgorithm.LEAST_DANGER_PATH_ADVANCED
 
 IMG_SIZE = 50
+FRAME_STACK_DEPTH = 2           # số ảnh liên tiếp trong state của agent vision
+ACTION_REPEAT = 1               # số lần cập nhật giữ nguyên một hành động của agent (frame skip), phần thưởng được cộng dồn
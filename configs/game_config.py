@@ -9,6 +9,10 @@ BASE_UPS = 60                       # Tốc độ cập nhật game (updates per
 UPDATE_DELTA_TIME = 1 / BASE_UPS    # delta time cho các lần cập nhật game (seconds)
 UPS =  BASE_UPS * GAME_SPEED        # Tốc độ cập nhật game (updates per second)
 dt_max = 3 / FPS
+RENDER_FPS = FPS                    # Số frame vẽ tối đa mỗi giây, độc lập với tốc độ cập nhật
+MAX_FRAME_SKIP_TIME = 0.25          # Khi vòng lặp không theo kịp: bỏ vẽ frame, nhưng vẽ ít nhất mỗi 0.25 s
+DIRTY_RECT_RENDERING = True         # Chỉ xoá và gửi lên màn hình những vùng đã vẽ (đạn, player, điểm)
+DIRTY_RECTS_MAX = 400               # Nhiều vùng hơn thế thì vẽ lại và flip cả màn hình
 
 PLAYER_SPEED = 200                  # Tốc độ di chuyển của player (pixel/s)
 DEFAULT_BULLET_SPEED = 150          # Tốc độ đạn (pixel/s)
@@ -24,9 +28,16 @@ class DrawSectorMethod(Enum):
     USE_TRIANGLE_AND_ARC = 2
     USE_PIL = 3
 
+class SimulationRate(Enum):
+    REAL_TIME = 0       # BASE_UPS lần cập nhật mỗi giây
+    FAST_FORWARD = 1    # BASE_UPS * DynamicConfig.GAME_SPEED lần cập nhật mỗi giây (đọc lại mỗi frame)
+    UNBOUNDED = 2       # cập nhật nhanh nhất có thể, chỉ vẽ và đọc event khoảng FPS lần mỗi giây
+
+SIMULATION_RATE = SimulationRate.FAST_FORWARD
+
 class DynamicConfig:
     DEFAULT_BULLET_SPEED = 150
-    GAME_SPEED = 5.0
+    GAME_SPEED = 1.0
     DISPLAY_PLAYER_TRAIL = True
     DISPLAY_BULLET_TRAIL = False
     USE_BULLET_COLORS = False
@@ -37,8 +48,10 @@ DRAW_SECTOR_METHOD = DrawSectorMethod.USE_POLYGON
 DISPLAY_PLAYER_TRAIL = False
 DISPLAY_BULLET_TRAIL = False
 TRAIL_MAX_LENGTH = 10  # Giới hạn số điểm lưu trong vệt mờ
+TRAIL_SPRITES_MAX = 4096  # số sprite vệt đạn giữ trong cache, quá thì xoá hết và vẽ lại
 
 USE_BULLET_COLORS = False
+CONTINUOUS_COLLISION = False  # va chạm theo quãng đường quét trong cả lần cập nhật (cho update_ticks > 1)
 # Colors (R, G, B)
 WHITE   = (255, 255, 255)
 BLACK   = (0, 0, 0)
@@ -51,25 +64,34 @@ CYAN    = (0, 255, 255)
 MAGENTA = (255, 0, 255)
 
 BulletConfig = namedtuple('BulletConfig', [
-    'num_bullets',
+    'num_bullets', # số viên mỗi loạt
     'speed',
     'spawn_time', # Tốc độ đạn (pixel/s) ở GAME_SPEED = 1.0
     'delay',
-    'interval_delay',
+    'interval_delay', # số tick giữa hai loạt của cùng một đợt
     'delay_offset_limit',
     'init_delay',
     'radius',
     'color',
-    'rotation_speed',  # cho rotating và spiral  # cho wave
-    'count', # cho expanding
+    'rotation_speed',  # độ xoay thêm mỗi loạt (độ)
+    'count', # số loạt mỗi đợt (0 hoặc 1: chỉ một loạt)
     'probability',
-    'enable'
-], defaults=[0] * 11)  # Set default 0 cho tất cả các trường
+    'enable',
+    'spread', # góc giữa hai viên trong một loạt (độ), 0: chia đều cả vòng tròn
+    'origin', # "corner": một góc màn hình ngẫu nhiên, "center": giữa màn hình
+    'aim', # "": không nhắm, "player": nhắm vào player, "wave": cả đợt nhắm theo player lúc bắt đầu và lượn sóng
+    'bouncing',
+    'wave_amplitude', # biên độ lượn sóng (pixel) cho aim="wave"
+], defaults=[0] * 11 + [0, "corner", "", False, 0])  # Set default 0 cho tất cả các trường
 
+# Mỗi mẫu đạn được mô tả hoàn toàn bằng cấu hình (game/emitters.py): thêm mẫu mới không cần thêm code.
+# Một đợt gồm `count` loạt cách nhau `interval_delay` tick; mẫu không nhắm quay đủ một vòng qua cả đợt
+# (cộng thêm rotation_speed mỗi loạt), mẫu nhắm giữ hướng nhắm.
 BULLET_PATTERNS = {
     "ring":     BulletConfig(num_bullets=24, speed=DEFAULT_BULLET_SPEED, delay=75,   interval_delay = 0, delay_offset_limit=20, radius=DEFAULT_BULLET_RADIUS, color=GREEN, probability=0.8, enable=True),
-    "bouncing": BulletConfig(num_bullets=10, speed=DEFAULT_BULLET_SPEED, delay=100,  interval_delay = 0, delay_offset_limit=35, radius=DEFAULT_BULLET_RADIUS, color=BLUE, probability=0.5, enable=True),
-    "spiral":   BulletConfig(num_bullets=36, speed=DEFAULT_BULLET_SPEED, delay=125,  interval_delay = 5, delay_offset_limit=50, radius=DEFAULT_BULLET_RADIUS, color=WHITE, rotation_speed=3, count=0, probability=0.8, enable=True),
-    "tornado":  BulletConfig(num_bullets=6, speed=DEFAULT_BULLET_SPEED, delay=1000, interval_delay = 10, delay_offset_limit=250, radius=DEFAULT_BULLET_RADIUS, color=WHITE, rotation_speed=5, count=0, probability=1.0, enable=True),
-    "sin_wave": BulletConfig(num_bullets=30, speed=DEFAULT_BULLET_SPEED, delay=75,   interval_delay = 5, delay_offset_limit=20, radius=DEFAULT_BULLET_RADIUS, color=WHITE, rotation_speed=5, count=16, probability=0.3, enable=False),
+    "bouncing": BulletConfig(num_bullets=10, speed=DEFAULT_BULLET_SPEED, delay=100,  interval_delay = 0, delay_offset_limit=35, radius=DEFAULT_BULLET_RADIUS, color=BLUE, probability=0.5, enable=True, bouncing=True),
+    "spiral":   BulletConfig(num_bullets=1, speed=DEFAULT_BULLET_SPEED, delay=125,  interval_delay = 5, delay_offset_limit=50, radius=DEFAULT_BULLET_RADIUS, color=WHITE, rotation_speed=3, count=36, probability=0.8, enable=True),
+    "tornado":  BulletConfig(num_bullets=6, speed=DEFAULT_BULLET_SPEED, delay=1000, interval_delay = 10, delay_offset_limit=250, radius=DEFAULT_BULLET_RADIUS, color=WHITE, rotation_speed=5, count=6, probability=1.0, enable=True, origin="center"),
+    "sin_wave": BulletConfig(num_bullets=1, speed=DEFAULT_BULLET_SPEED, delay=75,   interval_delay = 5, delay_offset_limit=20, radius=DEFAULT_BULLET_RADIUS, color=WHITE, count=16, probability=0.3, enable=False, aim="wave", wave_amplitude=30),
+    "targeted_shot": BulletConfig(num_bullets=1, speed=DEFAULT_BULLET_SPEED, delay=75, interval_delay = 0, delay_offset_limit=20, radius=DEFAULT_BULLET_RADIUS, color=RED, probability=0.8, enable=False, aim="player"),
 }
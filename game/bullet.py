@@ -1,80 +1,309 @@
-import pygame
-import math
-from collections import deque
-from configs.game_config import (SCREEN_WIDTH, SCREEN_HEIGHT, USE_BULLET_COLORS,
+import numpy as np
+from configs.game_config import (SCREEN_WIDTH, SCREEN_HEIGHT, WHITE,
                       DISPLAY_BULLET_TRAIL, TRAIL_MAX_LENGTH, UPDATE_DELTA_TIME)
-from utils.draw_utils import draw_water_drop
 from configs.game_config import DynamicConfig
 
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x: int, y: int, angle: int, speed: int, radius: int, color, fade=0, bouncing=False, from_corner=False, max_bounces=5):
-        super().__init__()
-        self.x = x
-        self.y = y
-        self.angle = angle
-        self.speed = speed
-        self.fade = fade
-        self.origin_color = color if DynamicConfig.USE_BULLET_COLORS else (255, 255, 255)
-        self.color = self.origin_color
-        self.bouncing = bouncing
-        self.from_corner = from_corner
-        self.radius = radius
-        self.alpha = 255 if fade else None
-        self.spawn_event = []
-        self.trail = deque(maxlen=TRAIL_MAX_LENGTH) if DISPLAY_BULLET_TRAIL else None
-        self.bounce_count = 0
-        self.max_bounces = max_bounces
-        self.was_bouncing = False 
-        
-
-        
-
-    def add_spawn_event(self, bullet_type, spawn_time, delay):
-        current_time = pygame.time.get_ticks()
-        self.spawn_event.append({
-            'bullet_type': bullet_type,
-            'spawn_time': spawn_time,
-            'delay': current_time + delay})    
-        
-    def update(self):
-        # inefficient due to constantly re-calculating sine and cosine
-        self.x += math.cos(self.angle) * self.speed * UPDATE_DELTA_TIME
-        self.y += math.sin(self.angle) * self.speed * UPDATE_DELTA_TIME
-        
-        if self.bouncing:
-            bounced = False
-            if self.x - self.radius <= 0 or self.x + self.radius >= SCREEN_WIDTH:
-                self.angle = math.pi - self.angle  
-                self.x = max(self.radius, min(SCREEN_WIDTH - self.radius, self.x))
-                bounced = True
-            if self.y - self.radius <= 0 or self.y + self.radius >= SCREEN_HEIGHT:
-                self.angle = - self.angle  
-                self.y = max(self.radius, min(SCREEN_HEIGHT - self.radius, self.y))
-                bounced = True
-
-            if bounced and not self.was_bouncing:
-                self.bounce_count += 1
-                self.was_bouncing = True
-            elif not bounced:
-                self.was_bouncing = False
-
-            if self.bounce_count >= self.max_bounces:
-                self.kill()
-
-        if self.fade:
-            self.alpha = max(0, self.alpha - self.fade)
-        if self.is_out_of_bounds():
-            self.kill()
-
-    def draw(self, surface):
-        if DynamicConfig.DISPLAY_BULLET_TRAIL and self.trail is not None:
-            self.trail.append((self.x, self.y))
-            draw_water_drop(surface, self)
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.radius)
-
-        
-    def is_out_of_bounds(self):
-        return not (0 <= self.x <= SCREEN_WIDTH and 0 <= self.y <= SCREEN_HEIGHT)
-    
-    def set_color(self, color):
-        self.color = color
\ No newline at end of file
+# Row index of each per-bullet field inside BulletStore.data
+# BOUNCE_TIME_X / BOUNCE_TIME_Y: fraction of the last update at which the bullet bounced on a vertical /
+# horizontal edge, 1 if it did not (used by the swept collision test, see game.collision)
+X, Y, VX, VY, RADIUS, BOUNCE_COUNT, MAX_BOUNCES, BOUNCING, BOUNCE_TIME_X, BOUNCE_TIME_Y = range(10)
+NUM_FIELDS = 10
+
+class BulletStore:
+    """
+    Structure-of-arrays storage for every live bullet.
+
+    Each per-bullet field is one row of the contiguous float32 matrix `data`
+    (see the X, Y, VX, VY, ... row constants), so movement, bouncing and culling
+    run as a handful of vectorized operations instead of one Python call per bullet.
+    Only the first `size` columns are live; dead bullets are flagged in `alive`
+    and compacted away at the end of `update`.
+
+    Velocities are stored in pixel/s, like `speed` in BULLET_PATTERNS.
+    `env` tags each bullet with the game it belongs to, so several independent
+    games (see VecGame) can share one store and be stepped as a single batch.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.size = 0
+        self.data = np.zeros((NUM_FIELDS, capacity), dtype=np.float32)
+        self.alive = np.ones(capacity, dtype=bool)
+        self.env = np.zeros(capacity, dtype=np.int32)
+        self.origin_color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+        # vệt mờ: mỗi viên đạn giữ TRAIL_MAX_LENGTH vị trí gần nhất trong một ring buffer chung
+        self.trail = np.zeros((capacity, TRAIL_MAX_LENGTH, 2), dtype=np.float32) if DISPLAY_BULLET_TRAIL else None
+        self.trail_length = np.zeros(capacity, dtype=np.int32)
+        self.trail_head = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[X, :self.size]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[Y, :self.size]
+
+    @property
+    def vx(self) -> np.ndarray:
+        return self.data[VX, :self.size]
+
+    @property
+    def vy(self) -> np.ndarray:
+        return self.data[VY, :self.size]
+
+    @property
+    def radius(self) -> np.ndarray:
+        return self.data[RADIUS, :self.size]
+
+    @property
+    def bounce_count(self) -> np.ndarray:
+        return self.data[BOUNCE_COUNT, :self.size]
+
+    @property
+    def bounce_time_x(self) -> np.ndarray:
+        return self.data[BOUNCE_TIME_X, :self.size]
+
+    @property
+    def bounce_time_y(self) -> np.ndarray:
+        return self.data[BOUNCE_TIME_Y, :self.size]
+
+    @property
+    def angle(self) -> np.ndarray:
+        return np.arctan2(self.vy, self.vx)
+
+    @property
+    def speed(self) -> np.ndarray:
+        return np.hypot(self.vx, self.vy)
+
+    def clear(self):
+        self.size = 0
+        self.trail_head = 0
+
+    def remove_env(self, env: int):
+        """Remove every bullet belonging to game `env`."""
+        n = self.size
+        self.alive[:n] = self.env[:n] != env
+        self.compact()
+
+    def add(self, x, y, angle, speed, radius, color, bouncing: bool = False, max_bounces: int = 5, env: int = 0) -> None:
+        """
+        Append one bullet, or a whole volley when any argument is an array.
+
+        Args:
+            x, y: Spawn position (scalar or array)
+            angle: Moving direction in radian (scalar or array)
+            speed: Speed in pixel/s (scalar or array)
+            radius: Bullet radius
+            color: Original RGB color (ignored when USE_BULLET_COLORS is off)
+            bouncing: Whether the bullets bounce on the screen edges
+            max_bounces: Number of bounces before a bouncing bullet disappears
+            env: Index of the game the bullets belong to (shared stores only)
+        """
+        x, y, angle, speed, radius = np.broadcast_arrays(x, y, angle, speed, radius)
+        count = x.size
+        if count == 0:
+            return
+        start = self.size
+        end = start + count
+        if end > self.capacity:
+            self._grow(end)
+
+        self.data[X, start:end] = x.ravel()
+        self.data[Y, start:end] = y.ravel()
+        self.data[VX, start:end] = np.cos(angle.ravel()) * speed.ravel()
+        self.data[VY, start:end] = np.sin(angle.ravel()) * speed.ravel()
+        self.data[RADIUS, start:end] = radius.ravel()
+        self.data[BOUNCE_COUNT, start:end] = 0
+        self.data[MAX_BOUNCES, start:end] = max_bounces
+        self.data[BOUNCING, start:end] = bouncing
+        self.data[BOUNCE_TIME_X:BOUNCE_TIME_Y + 1, start:end] = 1
+        self.origin_color[start:end] = color if DynamicConfig.USE_BULLET_COLORS else WHITE
+        self.color[start:end] = self.origin_color[start:end]
+        self.alive[start:end] = True
+        self.env[start:end] = env
+        self.trail_length[start:end] = 0
+        self.size = end
+
+    def update(self, delta_time: float = UPDATE_DELTA_TIME):
+        n = self.size
+        if n == 0:
+            return
+        x, y, vx, vy, radius = self.data[X, :n], self.data[Y, :n], self.data[VX, :n], self.data[VY, :n], self.data[RADIUS, :n]
+        x += vx * delta_time
+        y += vy * delta_time
+
+        alive = self.alive[:n]
+        self.data[BOUNCE_TIME_X:BOUNCE_TIME_Y + 1, :n] = 1
+        bouncing = self.data[BOUNCING, :n] > 0
+        if bouncing.any():
+            # phản xạ khi đi ra ngoài một cạnh (không tính đạn đang đi vào, vd vừa sinh ở mép màn hình)
+            hit_x = np.flatnonzero(bouncing & (((x - radius < 0) & (vx < 0)) | ((x + radius > SCREEN_WIDTH) & (vx > 0))))
+            self._reflect(x, vx, radius, hit_x, SCREEN_WIDTH, delta_time, self.data[BOUNCE_TIME_X, :n])
+            hit_y = np.flatnonzero(bouncing & (((y - radius < 0) & (vy < 0)) | ((y + radius > SCREEN_HEIGHT) & (vy > 0))))
+            self._reflect(y, vy, radius, hit_y, SCREEN_HEIGHT, delta_time, self.data[BOUNCE_TIME_Y, :n])
+
+            # mỗi cạnh chạm là một lần nảy, như positions_at
+            bounce_count = self.data[BOUNCE_COUNT, :n]
+            bounce_count[hit_x] += 1
+            bounce_count[hit_y] += 1
+            alive[:] = ~(bouncing & (bounce_count >= self.data[MAX_BOUNCES, :n]))
+        else:
+            alive[:] = True
+
+        alive &= (0 <= x) & (x <= SCREEN_WIDTH) & (0 <= y) & (y <= SCREEN_HEIGHT)
+        if not alive.all():
+            self.compact()
+
+    @staticmethod
+    def _reflect(position: np.ndarray, velocity: np.ndarray, radius: np.ndarray, hit: np.ndarray, size: float,
+                 delta_time: float, bounce_time: np.ndarray):
+        """
+        Bounce the bullets `hit` off the edge they went past on one axis: the overshoot is reflected back
+        (not clipped), so the path does not depend on the update length, and the moment of the bounce
+        is written to `bounce_time`.
+        """
+        if hit.size == 0:
+            return
+        p, v, r = position[hit], velocity[hit], radius[hit]
+        bound = np.where(v > 0, size - r, r)
+        bounce_time[hit] = np.clip(1 - (p - bound) / (v * delta_time), 0, 1)
+        position[hit] = 2 * bound - p
+        velocity[hit] = -v
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Read-only copy of the live bullets (trails are not kept), to be given back to `restore`.
+        Being read-only, one snapshot can be shared by every branch of a search.
+        """
+        n = self.size
+        snapshot = self.data[:, :n].copy(), self.env[:n].copy(), self.origin_color[:n].copy()
+        for array in snapshot:
+            array.flags.writeable = False
+        return snapshot
+
+    def restore(self, snapshot: tuple[np.ndarray, np.ndarray, np.ndarray]):
+        """Replace the live bullets by a `snapshot`. The snapshot is copied, so it can be restored again."""
+        data, env, origin_color = snapshot
+        n = data.shape[1]
+        if n > self.capacity:
+            self._grow(n)
+        self.data[:, :n] = data
+        self.env[:n] = env
+        self.origin_color[:n] = origin_color
+        self.color[:n] = origin_color
+        if self.trail is not None:
+            self.trail_length[:n] = 0
+        self.size = n
+
+    def positions_at(self, ticks, indices: np.ndarray = None, delta_time: float = UPDATE_DELTA_TIME,
+                     bounce: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Closed-form positions of bullets `ticks` updates from now, without stepping the simulation.
+
+        Bullets move in straight lines; bouncing bullets are folded back into the screen
+        (reflection on the edges, period 2 * (size - 2 * radius)) and their bounces are counted
+        from the number of folds, the same reflection `update` applies.
+
+        Args:
+            ticks: Number of updates ahead (scalar, or array broadcastable against the bullets,
+                   e.g. shape (T, 1) for T ticks at once)
+            indices: Bullets to query (default: every live bullet)
+            delta_time: Seconds per update
+            bounce: False extrapolates every bullet in a straight line, bouncing ones included
+
+        Returns:
+            (x, y, alive): positions, and False for the bullets that will have left the screen
+            or used up their bounces by then (their positions are meaningless)
+        """
+        data = self.data[:, :self.size] if indices is None else self.data[:, indices]
+        t = np.asarray(ticks, dtype=np.float64) * delta_time
+        x = data[X] + data[VX] * t
+        y = data[Y] + data[VY] * t
+        radius = data[RADIUS]
+        # một đường thẳng đi ra khỏi màn hình (hình lồi) thì không quay lại
+        alive = (0 <= x) & (x <= SCREEN_WIDTH) & (0 <= y) & (y <= SCREEN_HEIGHT)
+
+        bouncing = data[BOUNCING] > 0
+        if bounce and bouncing.any():
+            x_folded, x_bounces = self._fold(x, radius, SCREEN_WIDTH)
+            y_folded, y_bounces = self._fold(y, radius, SCREEN_HEIGHT)
+            x = np.where(bouncing, x_folded, x)
+            y = np.where(bouncing, y_folded, y)
+            bounce_alive = data[BOUNCE_COUNT] + x_bounces + y_bounces < data[MAX_BOUNCES]
+            alive = np.where(bouncing, bounce_alive, alive)
+        return x, y, alive
+
+    def trajectories(self, start_tick: int, end_tick: int, indices: np.ndarray = None,
+                     delta_time: float = UPDATE_DELTA_TIME, bounce: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Positions over the ticks start_tick..end_tick (both included), see `positions_at`.
+
+        Returns:
+            (x, y, alive): arrays of shape (end_tick - start_tick + 1, number of bullets)
+        """
+        ticks = np.arange(start_tick, end_tick + 1)[:, None]
+        return self.positions_at(ticks, indices, delta_time, bounce)
+
+    @staticmethod
+    def _fold(position: np.ndarray, radius: np.ndarray, size: float) -> tuple[np.ndarray, np.ndarray]:
+        """Reflect an unbounded coordinate into [radius, size - radius]. Returns (position, number of bounces)."""
+        length = np.maximum(size - 2 * radius, 1e-6)
+        offset = position - radius
+        bounces = np.abs(np.floor(offset / length))
+        offset = np.mod(offset, 2 * length)
+        return radius + np.where(offset > length, 2 * length - offset, offset), bounces
+
+    def compact(self):
+        """Drop every bullet whose `alive` flag is False, keeping the order of the others."""
+        n = self.size
+        keep = np.flatnonzero(self.alive[:n])
+        size = keep.size
+        self.data[:, :size] = self.data[:, keep]
+        self.env[:size] = self.env[keep]
+        self.origin_color[:size] = self.origin_color[keep]
+        self.color[:size] = self.color[keep]
+        if self.trail is not None:
+            self.trail[:size] = self.trail[keep]
+            self.trail_length[:size] = self.trail_length[keep]
+        self.alive[:size] = True
+        self.size = size
+
+    def record_trail(self):
+        """Push the current positions into the trail ring (called once per drawn frame)."""
+        n = self.size
+        self.trail[:n, self.trail_head, 0] = self.data[X, :n]
+        self.trail[:n, self.trail_head, 1] = self.data[Y, :n]
+        self.trail_head = (self.trail_head + 1) % TRAIL_MAX_LENGTH
+        np.minimum(self.trail_length[:n] + 1, TRAIL_MAX_LENGTH, out=self.trail_length[:n])
+
+    def trail_tail(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (tail, length): the oldest recorded position of each bullet, shape (size, 2),
+            and the number of recorded positions, shape (size,)
+        """
+        n = self.size
+        oldest = (self.trail_head - self.trail_length[:n]) % TRAIL_MAX_LENGTH
+        return self.trail[np.arange(n), oldest], self.trail_length[:n]
+
+    def _grow(self, min_capacity: int):
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+        data = np.zeros((NUM_FIELDS, capacity), dtype=np.float32)
+        data[:, :self.size] = self.data[:, :self.size]
+        self.data = data
+        self.alive = np.resize(self.alive, capacity)
+        self.env = np.resize(self.env, capacity)
+        self.origin_color = np.resize(self.origin_color, (capacity, 3))
+        self.color = np.resize(self.color, (capacity, 3))
+        self.trail_length = np.resize(self.trail_length, capacity)
+        if self.trail is not None:
+            self.trail = np.resize(self.trail, (capacity, TRAIL_MAX_LENGTH, 2))
+        self.capacity = capacity
@@ -1,15 +1,29 @@
-import pygame
+import heapq
 import math
 import random
-from configs.game_config import BULLET_PATTERNS, SCREEN_HEIGHT, SCREEN_WIDTH, GAME_SPEED, DEFAULT_BULLET_SPEED
-from configs.bot_config import SCAN_RADIUS
-from game.bullet import Bullet
+import numpy as np
+from configs.game_config import BULLET_PATTERNS, SCREEN_HEIGHT, SCREEN_WIDTH, GAME_SPEED, UPDATE_DELTA_TIME
+from game.bullet import BulletStore
 from game.player import Player
+from game.state_encoder import encode_regions, nearest_indices
+from game.emitters import PatternEmitter, BOUNCING, AIM_PLAYER, SIN_WAVE, WAVE_START
 
 class BulletManager:
-    def __init__(self, player: "Player"):
+    def __init__(self, player: "Player", bullets: BulletStore = None, env_id: int = 0, rng: random.Random = None):
+        """
+        Args:
+            player: The player targeted by aimed patterns
+            bullets: Shared bullet store (VecGame). None creates a private store
+            env_id: Tag of this game's bullets inside a shared store
+            rng: Random stream used for every spawning decision (owned by the game). None creates an unseeded one
+        """
         self.player = player
+        self.random = rng if rng is not None else random.Random()
         self.key = 0
+        self.env_id = env_id
+        self.shared_store = bullets is not None
+        self.bullets = bullets if bullets is not None else BulletStore()
+        self.timeline = None
         self.reset(0)
 
     def get_random_point(self) -> tuple[int, int]:
@@ -18,184 +32,133 @@ class BulletManager:
                    (padding, SCREEN_HEIGHT / 2), (SCREEN_WIDTH - padding, SCREEN_HEIGHT / 2), (SCREEN_WIDTH / 2, padding), (SCREEN_WIDTH / 2, SCREEN_HEIGHT - padding)]"""
         padding = 0
         corners = [(padding, padding), (SCREEN_WIDTH - padding, padding), (padding, SCREEN_HEIGHT - padding), (SCREEN_WIDTH - padding, SCREEN_HEIGHT - padding),]
-        return random.choice(corners)
+        return self.random.choice(corners)
     
-    def random_delay(self, event) -> int:
-        return random.randint(-event["prop"].delay_offset_limit, event["prop"].delay_offset_limit)
-    
-    def create_bullet_type(self, x, y, event: dict, update_num: int):
-        if event["type"] == "spiral":
-            if random.random() < event["prop"].probability or event["spawning"]:
-                event["spawning"] = True
-                if event["spawned"] == 0:
-                    event["spawn_x"], event["spawn_y"] = x, y
-                if update_num >= event["spawn_time"] + event["prop"].interval_delay * event["spawned"]:
-                    base_angle = math.radians(self.angle_offset)
-                    angle_step = 2 * math.pi / event["prop"].num_bullets
-                    self.bullets.add(Bullet(event["spawn_x"], event["spawn_y"], base_angle + event["spawned"] * angle_step, event["prop"].speed, event["prop"].radius, color=event["prop"].color))
-                    self.angle_offset += event["prop"].rotation_speed
-                    event["spawned"] += 1
-                if event["spawned"] >= event["prop"].num_bullets:
-                    event["spawned"] = 0
-                    event["spawn_time"] = update_num + event["prop"].delay + self.random_delay(event)
-                    self.angle_offset = 0
-                    event["spawning"] = False
-        
-        elif event["type"] == "tornado":
-            if random.random() < event["prop"].probability or event["spawning"]:
-                event["spawning"] = True
-                if event["spawned"] == 0:
-                    event["spawn_x"], event["spawn_y"] = SCREEN_HEIGHT/2, SCREEN_WIDTH/2
-                if update_num >= event["spawn_time"] + event["prop"].interval_delay * event["spawned"]:
-                    base_angle = math.radians(self.angle_offset)
-                    angle_step = 2 * math.pi / event["prop"].num_bullets
-                    Bullets = [Bullet(event["spawn_x"], event["spawn_y"], (2*math.pi/6)*i + base_angle + event["spawned"] * angle_step, event["prop"].speed, event["prop"].radius, color=event["prop"].color) for i in range(event["prop"].num_bullets)]
-                    self.bullets.add(Bullets)
-                    self.angle_offset += event["prop"].rotation_speed
-                    event["spawned"] += 1
-                if event["spawned"] >= event["prop"].num_bullets:
-                    event["spawned"] = 0
-                    event["spawn_time"] = update_num + event["prop"].delay + self.random_delay(event)
-                    self.angle_offset = 0
-                    event["spawning"] = False
-        
-        elif event["type"] == "sin_wave":
-            if random.random() < event["prop"].probability or event["spawning"]:
-                event["spawning"] = True
-
-                if event["spawned"] == 0:
-                    event["spawn_x"], event["spawn_y"] = x, y
-                    event["base_x"], event["base_y"] = x, y
-                    event["angle"] = math.atan2(self.player.y - event["spawn_y"], self.player.x - event["spawn_x"])
-
-                if update_num >= event["spawn_time"] + event["prop"].interval_delay * event["spawned"]:
-                    # Góc vuông góc với góc bắn
-                    perpendicular_angle = event["angle"] + math.pi / 2
-
-                    # Wave offset dao động theo 1 chu kỳ sin
-                    wave_phase = 4 * math.pi * (event["spawned"] / event["prop"].count)
-                    wave_offset = math.sin(wave_phase) * 30  # 30 là biên độ
+    def targeted_angle(self, x, y):
+        return np.arctan2(self.player.y - y, self.player.x - x)
 
-                    # Lệch theo hướng vuông góc
-                    spawn_x = event["base_x"] + wave_offset * math.cos(perpendicular_angle)
-                    spawn_y = event["base_y"] + wave_offset * math.sin(perpendicular_angle)
+    def sin_wave_angle(self, x: float, y: float) -> float:
+        return math.atan2(self.player.y - y, self.player.x - x)
 
-                    self.bullets.add(Bullet(spawn_x, spawn_y, event["angle"], event["prop"].speed, event["prop"].radius, color=event["prop"].color))
-
-                    event["spawned"] += 1
-
-                if event["spawned"] >= event["prop"].count:
-                    event["spawned"] = 0
-                    event["spawn_time"] = update_num + event["prop"].delay + self.random_delay(event)
-                    event["spawning"] = False
+    def emit(self, x, y, angle, speed, radius, color, bouncing: bool = False, aim: int = 0, wave_offset: float = 0.0):
+        """
+        Add a bullet or a volley to the store in one call.
 
-        elif event["type"] == "ring":
-            if random.random() < event["prop"].probability:
-                event["spawn_x"], event["spawn_y"] = x, y
-                angle_step = 2 * math.pi / event["prop"].num_bullets
-                new_bullets = [Bullet(event["spawn_x"], event["spawn_y"], i * angle_step, event["prop"].speed, event["prop"].radius, color=event["prop"].color) 
-                        for i in range(event["prop"].num_bullets)]
-                self.bullets.add(*new_bullets)
-                event["spawn_time"] = update_num + event["prop"].delay + self.random_delay(event)
+        With `aim` flags, `angle` is relative to the direction of the player and, for a sin_wave,
+        (x, y) is the origin of the wave, shifted sideways by `wave_offset` (see resolve_aim).
+        BulletTimeline records these arguments as they are and resolves them at replay time.
+        """
+        if aim & (AIM_PLAYER | SIN_WAVE):
+            x, y, angle = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64),
+                                              np.asarray(angle, dtype=np.float64))
+            x, y, angle = self.resolve_aim(x, y, angle, np.full(x.shape, aim, dtype=np.uint8),
+                                           np.full(x.shape, wave_offset, dtype=np.float64))
+        self.bullets.add(x, y, angle, speed, radius, color, bouncing=bouncing, env=self.env_id)
 
-        elif event["type"] == "targeted_shot":
-            if random.random() < event["prop"].probability:
-                event["spawn_x"], event["spawn_y"] = x, y
-                angle = math.atan2(self.player.x - y, self.player.y - x)
-                self.bullets.add(Bullet(event["spawn_x"], event["spawn_y"], angle, DEFAULT_BULLET_SPEED, event["prop"].radius, event["prop"].color))
-                event["spawn_time"] = update_num + event["prop"].delay + self.random_delay(event)
+    def resolve_aim(self, x: np.ndarray, y: np.ndarray, angle: np.ndarray,
+                    flags: np.ndarray, wave_offset: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Turn aim-relative bullets into absolute positions and angles against the current player.
+        Shared by live spawning and timeline replay, so both give bit-identical bullets.
+        """
+        aimed = (flags & AIM_PLAYER) > 0
+        wave = (flags & SIN_WAVE) > 0
+        x, y, angle = x.copy(), y.copy(), angle.copy()
+        if aimed.any():
+            angle[aimed] += self.targeted_angle(x[aimed], y[aimed])
+        if wave.any():
+            # một đợt sin_wave tại một thời điểm: viên đầu của đợt đặt lại góc nhắm cho cả đợt
+            starts = np.flatnonzero(flags & WAVE_START)
+            if starts.size:
+                self.wave_angle = self.sin_wave_angle(x[starts[0]], y[starts[0]])
+            perpendicular_angle = self.wave_angle + math.pi / 2
+            x[wave] += wave_offset[wave] * math.cos(perpendicular_angle)
+            y[wave] += wave_offset[wave] * math.sin(perpendicular_angle)
+            angle[wave] += self.wave_angle
+        return x, y, angle
 
-        elif event["type"] == "bouncing":
-            if random.random() < event["prop"].probability:
-                event["spawn_x"], event["spawn_y"] = x, y
-                angle_step = 2 * math.pi / event["prop"].num_bullets
-                new_bullets = [Bullet(event["spawn_x"], event["spawn_y"], i * angle_step, event["prop"].speed, event["prop"].radius, color=event["prop"].color, bouncing=True)
-                            for i in range(event["prop"].num_bullets)]
-                self.bullets.add(*new_bullets)
-                event["spawn_time"] = update_num + event["prop"].delay + self.random_delay(event)
-        
-    def get_bullets_detail(self):
-        return [(bullet.x, bullet.y, math.degrees(bullet.angle)) for bullet in self.bullets]
+    def get_bullets_detail(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Array of shape (num_bullets, 3) with columns x, y and moving angle (degree)
+        """
+        bullets = self.bullets
+        return np.column_stack((bullets.x, bullets.y, np.degrees(bullets.angle)))
     
     def color_in_radius(self, radius = None, color = None):
         if not radius or not color:
             return
-        radius_square = radius ** 2
-        for bullet in self.bullets:
-            distance_square = (self.player.x - bullet.x) ** 2 + (self.player.y - bullet.y) ** 2
-            if distance_square <= radius_square:
-                bullet.set_color(color)
-            else:
-                bullet.set_color(bullet.origin_color)
+        bullets = self.bullets
+        n = bullets.size
+        distance_square = (self.player.x - bullets.x) ** 2 + (self.player.y - bullets.y) ** 2
+        in_radius = (distance_square <= radius ** 2)[:, None]
+        bullets.color[:n] = np.where(in_radius, np.asarray(color, dtype=np.uint8), bullets.origin_color[:n])
     
-    def get_bullet_in_range(self, end_radius: int, start_radius: int = 0) -> list[Bullet]:
+    def get_bullet_in_range(self, end_radius: int, start_radius: int = 0) -> np.ndarray:
         """
-        Retrieves a list of bullets that are within a specified distance range from the player.
+        Retrieves the bullets that are within a specified distance range from the player.
 
         Args:
             end_radius (float): The maximum distance from the player within which bullets should be retrieved.
             start_radius (float, optional): The minimum distance from the player to consider bullets. Defaults to 0.
 
         Returns:
-            list[Bullet]: A list of bullets that are within the specified range.
+            np.ndarray: Indices (into `self.bullets`) of the bullets within the specified range.
         """
         start_radius_square = start_radius * start_radius
         end_radius_square = end_radius * end_radius
 
-        return [bullet for bullet in self.bullets 
-            if start_radius_square <= (self.player.x - bullet.x) ** 2 + 
-               (self.player.y - bullet.y) ** 2 <= end_radius_square]
-    
-    def get_complex_regions(self, bullets: list[Bullet], 
+        distance_square = (self.player.x - self.bullets.x) ** 2 + (self.player.y - self.bullets.y) ** 2
+        in_range = (start_radius_square <= distance_square) & (distance_square <= end_radius_square)
+        if self.shared_store:
+            in_range &= self.bullets.env[:self.bullets.size] == self.env_id
+        return np.flatnonzero(in_range)
+
+    def get_nearest_bullets(self, num_bullets: int) -> np.ndarray:
+        """
+        Indices (into `self.bullets`) of the `num_bullets` bullets closest to the player, closest first.
+        Fewer when there are fewer bullets. O(N) in the number of bullets whatever `num_bullets` is.
+        """
+        candidates = None
+        if self.shared_store:
+            candidates = np.flatnonzero(self.bullets.env[:self.bullets.size] == self.env_id)
+        dx, dy = self.offsets(candidates if candidates is not None else slice(None))
+        nearest = nearest_indices(dx * dx + dy * dy, num_bullets)
+        return candidates[nearest] if candidates is not None else nearest
+
+    def offsets(self, bullets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Position of `bullets` relative to the player (bullet - player), in float64."""
+        return (np.subtract(self.bullets.x[bullets], self.player.x, dtype=np.float64),
+                np.subtract(self.bullets.y[bullets], self.player.y, dtype=np.float64))
+
+    def get_complex_regions(self, bullets: np.ndarray, 
                         num_angle_divisions: int = 8, 
-                        num_radius_divisions: int = 3) -> list[float]:
+                        num_radius_divisions: int = 3,
+                        out: np.ndarray = None, counts: np.ndarray = None, nearest: np.ndarray = None) -> np.ndarray:
         """
         Converts bullet positions into a complex region representation based on both
         angle and distance from player.
 
         Args:
-            bullets: List of bullets to analyze
+            bullets: Indices of the bullets to analyze
             num_angle_divisions: Number of angular divisions (like 8 directions)
             num_radius_divisions: Number of radius divisions (rings around player)
+            out: Preallocated output (float64, num_angle_divisions * num_radius_divisions). None allocates it
+            counts, nearest: Optional outputs of the same size: number of bullets and distance
+                             of the closest bullet (inf if none) in each region
 
         Returns:
-            List[float]: List of length (num_angle_divisions * num_radius_divisions)
+            np.ndarray: Array of length (num_angle_divisions * num_radius_divisions)
                         where 1 indicates bullet presence in that region
         """
-        total_regions = num_angle_divisions * num_radius_divisions
-        region_flags = [0] * total_regions
-        
-        sector_angle = 2 * math.pi / num_angle_divisions
-        sector_radius = SCAN_RADIUS / num_radius_divisions
-        start_angle = -sector_angle / 2
-        
-        for bullet in bullets:
-            # Tính khoảng cách từ đạn đến player
-            dx = bullet.x - self.player.x
-            dy = bullet.y - self.player.y
-            distance = math.sqrt(dx*dx + dy*dy)
-            if distance >= SCAN_RADIUS:
-                continue
-            
-            # Xác định vòng (ring) chứa đạn
-            ring_index = (num_radius_divisions - 1) if distance >= SCAN_RADIUS else int(distance / sector_radius)
-            
-            # Tính góc của viên đạn
-            angle = math.atan2(-dy, dx)
-            
-            # Dịch trục quay trái π/8 để vùng 0 nằm giữa start_angle và start_angle + sector_angle
-            angle_shifted = (angle - start_angle) % (2 * math.pi)
-            
-            # Tính index vùng (mỗi vùng rộng π/4), đảm bảo kết quả trong [0, 7]
-            angle_index = int(angle_shifted // sector_angle) % 8
-            
-            # Convert vị trí 2D (ring, angle) thành index 1D
-            region_index = ring_index * num_angle_divisions + angle_index
-            region_flags[region_index] = 1
-            
-        return region_flags
+        if out is None:
+            out = np.zeros(num_angle_divisions * num_radius_divisions, dtype=np.float64)
+        dx, dy = self.offsets(bullets)
+        return encode_regions(dx, dy, out, True, num_angle_divisions, num_radius_divisions,
+                              counts=counts, nearest=nearest)
     
-    def get_simple_regions(self, bullets: list[Bullet], num_sectors: int = 8) -> list[float]:
+    def get_simple_regions(self, bullets: np.ndarray, num_sectors: int = 8,
+                           out: np.ndarray = None, counts: np.ndarray = None, nearest: np.ndarray = None) -> np.ndarray:
         """
         Converts bullet positions into an 8-region representation based on their angle 
         relative to the player.
@@ -204,10 +167,11 @@ class BulletManager:
         assigning a value of 1 to any region that contains at least one bullet.
 
         Args:
-            bullets (List[Bullet]): A list of bullets to be analyzed.
+            bullets (np.ndarray): Indices of the bullets to be analyzed (already in the scan circle).
+            out, counts, nearest: see get_complex_regions
 
         Returns:
-            List[float]: A list of 8 floats (either 0 or 1) representing whether bullets 
+            np.ndarray: 8 floats (either 0 or 1) representing whether bullets 
         
         Index Mapping:
             0: Right
@@ -219,43 +183,87 @@ class BulletManager:
             6: Down
             7: Down_right
         """
-        sector_flags = [0] * num_sectors
-        sector_angle = 2 * math.pi / num_sectors  # Góc mỗi nan quạt
-        start_angle = -sector_angle / 2
+        if out is None:
+            out = np.zeros(num_sectors, dtype=np.float64)
+        # bullets đã nằm trong vùng quét: không lọc lại theo bán kính
+        dx, dy = self.offsets(bullets)
+        return encode_regions(dx, dy, out, False, num_sectors, radius=np.inf, counts=counts, nearest=nearest)
+
+    def update(self, update_num: int, num_ticks: int = 1):
+        """Spawn for the `num_ticks` ticks ending at `update_num`, then move the bullets over all of them at once."""
+        self.spawn_ticks(update_num - num_ticks + 1, update_num)
+        self.bullets.update(num_ticks * UPDATE_DELTA_TIME)
 
-        for bullet in bullets:
-            # Tính góc của viên đạn so với nhân vật
-            angle = math.atan2(self.player.y - bullet.y, bullet.x - self.player.x)
+    def spawn_ticks(self, first_tick: int, last_tick: int):
+        """
+        Run the spawn schedule for ticks first_tick..last_tick ahead of a single bullets.update covering them all.
+        Bullets spawned after first_tick are moved back along their path, so that update brings them
+        exactly where one update per tick would have.
+        """
+        bullets = self.bullets
+        for tick in range(first_tick, last_tick + 1):
+            size = bullets.size
+            self.spawn(tick)
+            if tick > first_tick and bullets.size > size:
+                rewind = (tick - first_tick) * UPDATE_DELTA_TIME
+                bullets.x[size:] -= bullets.vx[size:] * rewind
+                bullets.y[size:] -= bullets.vy[size:] * rewind
 
-            # Chỉnh lại góc về phạm vi [0, 2*pi)
-            angle = (angle - start_angle) % (2 * math.pi)
+    def spawn(self, update_num: int):
+        """Run the spawn schedule only, without moving the bullets (a shared store is moved once by its owner)."""
+        if self.timeline is not None:
+            self.replay_timeline(update_num - self.start_tick)
+            return
+        # chỉ các emitter đã tới hạn mới được đánh thức; tick không có emitter nào tới hạn chỉ tốn một phép so sánh
+        schedule = self.schedule
+        while schedule and schedule[0][0] <= update_num:
+            _, order, emitter = schedule[0]
+            emitter.next_tick = emitter.fire(update_num)
+            heapq.heapreplace(schedule, (emitter.next_tick, order, emitter))
 
-            # Xác định nan quạt nào chứa viên đạn
-            sector_index = int(angle // sector_angle)
-            sector_flags[sector_index] = 1
+    def snapshot(self) -> tuple:
+        """
+        Bullets and spawn schedule state, to be given back to `restore`.
+        With a shared store (VecGame) the bullets of every game are captured.
+        """
+        return (self.bullets.snapshot(), self.key, self.start_tick, self.wave_angle,
+                self.emitters, tuple(dict(vars(emitter)) for emitter in self.emitters), tuple(self.schedule))
 
-        return sector_flags
+    def restore(self, snapshot: tuple):
+        bullets, self.key, self.start_tick, self.wave_angle, emitters, emitter_states, schedule = snapshot
+        self.bullets.restore(bullets)
+        # chép lại trạng thái các emitter để snapshot không bị sửa khi game chạy tiếp
+        self.emitters = emitters
+        for emitter, state in zip(emitters, emitter_states):
+            emitter.__dict__.update(state)
+        self.schedule = list(schedule)
 
-    def update(self, update_num: int):
-        for event in self.spawn_event:
-            if update_num >= event["spawn_time"] and event["prop"].enable:
-                self.create_bullet_type(*self.get_random_point(), event, update_num)
-        self.bullets.update()
+    def set_timeline(self, timeline: "BulletTimeline"):
+        """Replay a precomputed BulletTimeline instead of running the spawn schedule (None: back to live spawning)."""
+        self.timeline = timeline
 
-    def draw(self, screen):
-        for bullet in self.bullets:
-            bullet.draw(screen)
+    def replay_timeline(self, tick: int):
+        """Add the bullets recorded for `tick` (counted from the last reset), re-aiming the player-aimed ones."""
+        timeline = self.timeline
+        start, end = timeline.rows_at(tick)
+        if start == end:
+            return
+        x, y, angle = timeline.x[start:end], timeline.y[start:end], timeline.angle[start:end]
+        flags = timeline.flags[start:end]
+        if (flags & (AIM_PLAYER | SIN_WAVE)).any():
+            x, y, angle = self.resolve_aim(x, y, angle, flags, timeline.wave_offset[start:end])
+        self.bullets.add(x, y, angle, timeline.speed[start:end], timeline.radius[start:end], timeline.color[start:end],
+                         bouncing=(flags & BOUNCING) > 0, env=self.env_id)
 
     def reset(self, update_count: int = 0):
-        self.bullets = pygame.sprite.Group()
-        self.spawn_time = 0
-        self.angle_offset = 0
+        if self.shared_store:
+            self.bullets.remove_env(self.env_id)
+        else:
+            self.bullets.clear()
+        self.start_tick = update_count
+        self.wave_angle = 0.0
         self.radius = 5
-        self.spawn_event = [
-            {"type": "ring",     "spawn_time": BULLET_PATTERNS["ring"].delay + update_count,     "spawned": 0, "spawn_x": 0, "spawn_y": 0, "prop": BULLET_PATTERNS["ring"]},
-            {"type": "target",   "spawn_time": BULLET_PATTERNS["ring"].delay + update_count,     "spawned": 0, "spawn_x": 0, "spawn_y": 0, "prop": BULLET_PATTERNS["ring"]},
-            {"type": "bouncing", "spawn_time": BULLET_PATTERNS["bouncing"].delay + update_count, "spawned": 0, "spawn_x": 0, "spawn_y": 0, "prop": BULLET_PATTERNS["bouncing"]},
-            {"type": "spiral",   "spawn_time": BULLET_PATTERNS["spiral"].delay + update_count,   "spawned": 0, "spawn_x": 0, "spawn_y": 0, "prop": BULLET_PATTERNS["spiral"], "spawning": False},
-            {"type": "tornado",  "spawn_time": BULLET_PATTERNS["tornado"].delay + update_count,  "spawned": 0, "spawn_x": 0, "spawn_y": 0, "prop": BULLET_PATTERNS["tornado"], "spawning": False},
-            {"type": "sin_wave", "spawn_time": BULLET_PATTERNS["sin_wave"].delay + update_count, "spawned": 0, "spawn_x": 0, "spawn_y": 0, "prop": BULLET_PATTERNS["sin_wave"], "base_x": 0, "base_y": 0, "angle": 0, "spawning": False},
-        ]
+        self.emitters = [PatternEmitter(self, prop, update_count) for prop in BULLET_PATTERNS.values() if prop.enable]
+        # heap (tick tới hạn, thứ tự, emitter): thứ tự giữ các emitter cùng tick chạy theo thứ tự BULLET_PATTERNS
+        self.schedule = [(emitter.next_tick, order, emitter) for order, emitter in enumerate(self.emitters)]
+        heapq.heapify(self.schedule)
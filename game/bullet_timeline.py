@@ -0,0 +1,87 @@
+import random
+import numpy as np
+from configs.game_config import BASE_UPS
+from game.bullet_manager import BulletManager, BOUNCING
+from game.player import Player
+
+TIMELINE_TICKS = 60 * BASE_UPS  # độ dài ghi trước (1 phút), tự kéo dài khi episode sống lâu hơn
+
+class TimelineRecorder(BulletManager):
+    """BulletManager whose spawns are recorded as rows of a BulletTimeline instead of being added to a store."""
+
+    def __init__(self, seed: int):
+        self.tick = 0
+        self.chunks = []
+        # player giả: các góc nhắm được tính lại theo player thật lúc phát lại
+        super().__init__(Player(), rng=random.Random(seed))
+
+    def emit(self, x, y, angle, speed, radius, color, bouncing: bool = False, aim: int = 0, wave_offset: float = 0.0):
+        x, y, angle, speed, radius = np.broadcast_arrays(x, y, angle, speed, radius)
+        count = x.size
+        self.chunks.append((
+            np.full(count, self.tick, dtype=np.int32),
+            x.ravel().astype(np.float64), y.ravel().astype(np.float64), angle.ravel().astype(np.float64),
+            speed.ravel().astype(np.float64), radius.ravel().astype(np.float32),
+            np.full(count, aim | (BOUNCING if bouncing else 0), dtype=np.uint8),
+            np.full(count, wave_offset, dtype=np.float64),
+            np.broadcast_to(np.asarray(color, dtype=np.uint8), (count, 3)),
+        ))
+
+    def record(self, num_ticks: int):
+        """Run the spawn schedule for `num_ticks` more ticks (same RNG stream as a live game with this seed)."""
+        for _ in range(num_ticks):
+            self.tick += 1
+            self.spawn(self.tick)
+
+class BulletTimeline:
+    """
+    Every bullet a game seeded with `seed` will spawn, precomputed once as compact arrays
+    (spawn tick, origin, angle, speed, radius, flags, color) sorted by tick.
+
+    Spawning does not depend on the player except for the aim of targeted_shot and sin_wave,
+    so a timeline can be replayed by every bot (BulletManager.set_timeline) on exactly the same
+    bullet field, with only those aimed bullets resolved against the live player. A replayed
+    episode is bit-identical to a live episode with the same seed.
+
+    Ticks are counted from the game's reset (the first update is tick 1). The recording is
+    extended automatically when an episode outlives it.
+    """
+
+    def __init__(self, seed: int, num_ticks: int = TIMELINE_TICKS):
+        self.seed = seed
+        self.recorder = TimelineRecorder(seed)
+        self.num_ticks = 0
+        self.tick = np.zeros(0, dtype=np.int32)
+        self.tick_start = np.zeros(1, dtype=np.int64)
+        self.extend(num_ticks)
+
+    def __len__(self) -> int:
+        return self.tick.size
+
+    def extend(self, num_ticks: int):
+        recorder = self.recorder
+        recorder.record(num_ticks)
+        self.num_ticks = recorder.tick
+        if recorder.chunks:
+            columns = list(zip(*recorder.chunks))
+            if self.tick.size:
+                columns = [(old,) + new for old, new in zip(self.columns(), columns)]
+            (self.tick, self.x, self.y, self.angle, self.speed, self.radius,
+             self.flags, self.wave_offset, self.color) = (np.concatenate(column) for column in columns)
+            recorder.chunks = []
+        elif not self.tick.size:
+            (self.x, self.y, self.angle, self.speed, self.wave_offset) = (np.zeros(0) for _ in range(5))
+            self.radius = np.zeros(0, dtype=np.float32)
+            self.flags = np.zeros(0, dtype=np.uint8)
+            self.color = np.zeros((0, 3), dtype=np.uint8)
+        # tick_start[t] .. tick_start[t + 1]: các hàng của tick t
+        self.tick_start = np.searchsorted(self.tick, np.arange(self.num_ticks + 2))
+
+    def columns(self) -> tuple:
+        return (self.tick, self.x, self.y, self.angle, self.speed, self.radius, self.flags, self.wave_offset, self.color)
+
+    def rows_at(self, tick: int) -> tuple[int, int]:
+        """Row range [start, end) of the bullets spawned at `tick`."""
+        if tick > self.num_ticks:
+            self.extend(max(tick - self.num_ticks, self.num_ticks))
+        return int(self.tick_start[tick]), int(self.tick_start[tick + 1])
@@ -0,0 +1,71 @@
+import numpy as np
+
+def closest_distance_square(dx: np.ndarray, dy: np.ndarray, move_x: np.ndarray, move_y: np.ndarray,
+                            s_min=0.0, s_max=1.0) -> np.ndarray:
+    """
+    Smallest squared distance between two points over one update, both moving in a straight line
+    (swept test, so fast bullets cannot tunnel through the player between two updates).
+
+    Args:
+        dx, dy: Offset bullet - player at the end of the update
+        move_x, move_y: Displacement of the bullet relative to the player during the update
+        s_min, s_max: Part of the update to test (scalars or arrays), as fractions of it
+
+    Returns:
+        np.ndarray: min over s in [s_min, s_max] of |offset at start + s * displacement|^2
+    """
+    start_x = dx - move_x
+    start_y = dy - move_y
+    length_square = move_x * move_x + move_y * move_y
+    # s* = -start . move / |move|^2 kẹp trong [s_min, s_max]; không dịch chuyển tương đối thì s = s_min
+    s = np.divide(-(start_x * move_x + start_y * move_y), length_square,
+                  out=np.zeros(np.shape(length_square)), where=length_square > 0)
+    np.clip(s, s_min, s_max, out=s)
+    closest_x = start_x + s * move_x
+    closest_y = start_y + s * move_y
+    return closest_x * closest_x + closest_y * closest_y
+
+def swept_distance_square(dx: np.ndarray, dy: np.ndarray, vx: np.ndarray, vy: np.ndarray,
+                          bounce_time_x: np.ndarray, bounce_time_y: np.ndarray, delta_time: float,
+                          player_move_x, player_move_y) -> np.ndarray:
+    """
+    Smallest squared distance between each bullet and the player over the last update, the bullets
+    following their real path: one that bounced during the update (see BulletStore.update) is swept
+    along its velocity before the bounce, then along the current one.
+
+    Args:
+        dx, dy: Offset bullet - player at the end of the update
+        vx, vy: Bullet velocities at the end of the update
+        bounce_time_x, bounce_time_y: Fraction of the update at which each bullet bounced on a
+                                      vertical / horizontal edge, 1 if it did not
+        delta_time: Seconds covered by the update
+        player_move_x, player_move_y: Displacement of the player during the update (scalars or per bullet)
+    """
+    move_x = vx * delta_time
+    move_y = vy * delta_time
+    distance_square = closest_distance_square(dx, dy, move_x - player_move_x, move_y - player_move_y)
+    bounced = np.flatnonzero((bounce_time_x < 1) | (bounce_time_y < 1))
+    if bounced.size == 0:
+        return distance_square
+
+    dx, dy, move_x, move_y = dx[bounced], dy[bounced], move_x[bounced], move_y[bounced]
+    time_x, time_y = bounce_time_x[bounced], bounce_time_y[bounced]
+    if np.ndim(player_move_x):
+        player_move_x, player_move_y = player_move_x[bounced], player_move_y[bounced]
+    # tối đa một lần nảy mỗi trục: ba đoạn thẳng [0, first], [first, second], [second, 1]
+    first = np.minimum(time_x, time_y)
+    second = np.maximum(time_x, time_y)
+    closest = np.full(bounced.size, np.inf)
+    for start, end in ((0.0, first), (first, second), (second, 1.0)):
+        middle = (start + end) / 2
+        # trước lần nảy: vận tốc ngược dấu, trên đường thẳng qua điểm nảy (offset ở cuối update lùi 2 * move * (1 - t))
+        before_x = middle < time_x
+        before_y = middle < time_y
+        segment_dx = np.where(before_x, dx - 2 * move_x * (1 - time_x), dx)
+        segment_dy = np.where(before_y, dy - 2 * move_y * (1 - time_y), dy)
+        segment_move_x = np.where(before_x, -move_x, move_x) - player_move_x
+        segment_move_y = np.where(before_y, -move_y, move_y) - player_move_y
+        np.minimum(closest, closest_distance_square(segment_dx, segment_dy, segment_move_x, segment_move_y, start, end),
+                   out=closest)
+    distance_square[bounced] = closest
+    return distance_square
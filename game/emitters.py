@@ -0,0 +1,84 @@
+import math
+import numpy as np
+from configs.game_config import BulletConfig, SCREEN_HEIGHT, SCREEN_WIDTH
+
+# Spawn flags (see BulletManager.emit and BulletTimeline)
+BOUNCING = 1        # đạn nảy
+AIM_PLAYER = 2      # góc bắn tính từ hướng nhắm vào player lúc bắn (targeted_shot)
+SIN_WAVE = 4        # vị trí và góc phụ thuộc góc nhắm của cả đợt sin_wave
+WAVE_START = 8      # viên đầu tiên của một đợt sin_wave: góc nhắm được tính lại
+
+AIM_FLAGS = {"": 0, "player": AIM_PLAYER, "wave": SIN_WAVE}
+
+class PatternEmitter:
+    """
+    One bullet pattern of a BulletManager, driven only by its BulletConfig and woken up by its
+    scheduler only when due.
+
+    `fire(tick)` is called at `next_tick` and returns the tick at which the emitter wants to be
+    woken up again. While waiting for its `probability` roll to succeed an emitter is polled
+    every tick, exactly like the old per-tick loop. Once the roll succeeds it fires a wave of
+    `count` volleys, `interval_delay` ticks apart, each volley being `num_bullets` bullets
+    `spread` degrees apart appended to the store in one call.
+
+    The angles of a volley relative to its first bullet are computed once; a volley only adds
+    the turn of its step (or, for aimed patterns, is resolved against the player by BulletManager.emit).
+    """
+
+    def __init__(self, manager: "BulletManager", prop: BulletConfig, start_tick: int):
+        self.manager = manager
+        self.prop = prop
+        self.next_tick = start_tick + prop.delay
+        num_bullets = max(prop.num_bullets, 1)
+        spread = math.radians(prop.spread) if prop.spread else 2 * math.pi / num_bullets
+        self.volley_angles = np.arange(num_bullets) * spread
+        self.num_steps = max(prop.count, 1)
+        # mẫu không nhắm quay đủ một vòng qua cả đợt, mẫu nhắm giữ hướng nhắm
+        self.step_angle = 2 * math.pi / self.num_steps if not prop.aim else 0.0
+        self.aim = AIM_FLAGS[prop.aim]
+        self.spawning = False
+        self.spawned = 0
+        self.spawn_x, self.spawn_y = 0, 0
+
+    def roll(self) -> bool:
+        return self.manager.random.random() < self.prop.probability
+
+    def next_volley_tick(self, tick: int) -> int:
+        limit = self.prop.delay_offset_limit
+        return tick + self.prop.delay + self.manager.random.randint(-limit, limit)
+
+    def start_wave(self):
+        if self.prop.origin == "center":
+            self.spawn_x, self.spawn_y = SCREEN_HEIGHT / 2, SCREEN_WIDTH / 2
+        else:
+            self.spawn_x, self.spawn_y = self.manager.get_random_point()
+
+    def fire_step(self):
+        prop = self.prop
+        step = self.spawned
+        angles = self.volley_angles
+        if step:
+            angles = angles + (math.radians(prop.rotation_speed * step) + step * self.step_angle)
+        aim, wave_offset = self.aim, 0.0
+        if aim & SIN_WAVE:
+            # Wave offset dao động theo 1 chu kỳ sin, lệch vuông góc với hướng nhắm
+            wave_offset = math.sin(4 * math.pi * (step / self.num_steps)) * prop.wave_amplitude
+            if step == 0:
+                aim |= WAVE_START
+        self.manager.emit(self.spawn_x, self.spawn_y, angles, prop.speed, prop.radius, prop.color,
+                          bouncing=prop.bouncing, aim=aim, wave_offset=wave_offset)
+
+    def fire(self, tick: int) -> int:
+        if not self.spawning:
+            if not self.roll():
+                return tick + 1
+            self.spawning = True
+            self.spawned = 0
+            self.start_wave()
+        self.fire_step()
+        self.spawned += 1
+        if self.spawned >= self.num_steps:
+            self.spawning = False
+            self.spawned = 0
+            return self.next_volley_tick(tick)
+        return tick + max(self.prop.interval_delay, 1)
@@ -1,37 +1,108 @@
 import pygame
 import sys
-import math
+import time
+import itertools
 import numpy as np
+from collections import deque
 from configs.game_config import (
-    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, UPS,
-    dt_max, BOX_LEFT, BOX_TOP, BOX_SIZE, BASE_UPS
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, RENDER_FPS, MAX_FRAME_SKIP_TIME,
+    DIRTY_RECT_RENDERING, DIRTY_RECTS_MAX, dt_max, BOX_LEFT, BOX_TOP, BOX_SIZE, BASE_UPS,
+    DISPLAY_PLAYER_TRAIL, TRAIL_MAX_LENGTH, TRAIL_SPRITES_MAX,
+    SimulationRate, SIMULATION_RATE, CONTINUOUS_COLLISION
 )
-from configs.bot_config import USE_COMPLEX_SCANNING, SCAN_RADIUS
-from game.bullet_manager import BulletManager
-from game.player import Player
+from game.simulation import Simulation
 from menu import Menu
 from options_menu import Options_Menu
 from configs.game_config import DynamicConfig
+from configs.bot_config import SCAN_RADIUS
+from utils.draw_utils import draw_water_drop_at, water_drop_polygons
 
-class Game:
-    def __init__(self):
+class Game(Simulation):
+    """
+    Pygame front-end of the simulation: window, events, keyboard control and rendering.
+    All game logic lives in `Simulation`; use it directly when no window is needed.
+    """
+
+    def __init__(self, simulation_rate: SimulationRate = SIMULATION_RATE, game_speed: float = None, seed: int = None,
+                 update_ticks: int = 1, continuous_collision: bool = CONTINUOUS_COLLISION):
         pygame.init()
         self.surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Touhou")
         self.clock = pygame.time.Clock() 
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.screen_rect = self.surface.get_rect()
-        self.update_counter = 0
-        self.player = Player(self.surface)
-        self.bullet_manager = BulletManager(self.player)
-        self.restart_game()
+        self.player_trail = deque(maxlen=TRAIL_MAX_LENGTH) if DISPLAY_PLAYER_TRAIL else None
+        self.set_simulation_rate(simulation_rate, game_speed)
+        self.next_event_time = 0.0
+        self.next_draw_time = 0.0
+        self.last_draw_time = 0.0
+        self.tick_budget = 1 / FPS  # thời gian thực cho phép giữa hai lần tick đồng hồ
+        # nền tĩnh (màn hình đen + khung), dùng để xoá các vùng đã vẽ ở frame trước
+        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.background.fill((0, 0, 0))
+        self.draw_box(self.background)
+        self.dirty_rects = []
+        self.full_redraw = True
+        super().__init__(seed, update_ticks, continuous_collision)
         self.font=pygame.font.Font(None, 36)
+        self.bullet_sprites = {}  # (bán kính, màu) -> surface vẽ sẵn một viên đạn
+        self.trail_sprites = {}  # (bán kính, màu, dx, dy) -> (surface vệt đạn, góc trên trái so với đuôi)
+        self.score_text = None
+        self.score_text_value = None
         self.menu=Menu(self.screen)
         self.options_menu= Options_Menu(self.screen,self.font)
     
+    def set_simulation_rate(self, simulation_rate: SimulationRate, game_speed: float = None):
+        """
+        Args:
+            simulation_rate: REAL_TIME, FAST_FORWARD (N-times speed) or UNBOUNDED (as fast as the CPU allows)
+            game_speed: N for FAST_FORWARD. None follows DynamicConfig.GAME_SPEED live (config panel)
+        """
+        self.simulation_rate = simulation_rate
+        self.game_speed = game_speed
+
+    def get_updates_per_second(self) -> float:
+        """Target update rate for the current mode (inf when UNBOUNDED). Each update covers `update_ticks` ticks."""
+        if self.simulation_rate == SimulationRate.UNBOUNDED:
+            return float("inf")
+        if self.simulation_rate == SimulationRate.REAL_TIME:
+            return BASE_UPS / self.update_ticks
+        game_speed = self.game_speed if self.game_speed is not None else DynamicConfig.GAME_SPEED
+        return BASE_UPS * max(game_speed, 0.01) / self.update_ticks
+
+    def tick_clock(self, updates: int = 1):
+        """Call once per `updates` updates in loops that step the game themselves, to keep them at the target rate."""
+        if self.simulation_rate != SimulationRate.UNBOUNDED:
+            self.tick_budget = updates / self.get_updates_per_second()
+            self.clock.tick(self.get_updates_per_second() / updates)
+
+    def is_behind(self) -> bool:
+        """True when the work since the previous clock tick overran its budget: the loop cannot keep its target rate."""
+        return self.simulation_rate != SimulationRate.UNBOUNDED and self.clock.get_rawtime() > self.tick_budget * 1000
+
+    def render(self, draw_extra: callable = None) -> bool:
+        """
+        Draw a frame unless it is dropped: at most RENDER_FPS frames per second, whatever the update rate,
+        and none while the loop is behind its target rate (so the updates catch up), except that a frame
+        is drawn at least every MAX_FRAME_SKIP_TIME seconds to keep the window alive.
+
+        Returns:
+            bool: True if the frame was drawn
+        """
+        now = time.perf_counter()
+        if now < self.next_draw_time:
+            return False
+        if self.is_behind() and now - self.last_draw_time < MAX_FRAME_SKIP_TIME:
+            return False
+        interval = 1 / RENDER_FPS
+        # giữ nhịp đều theo lịch, nhưng không dồn frame khi đã trễ
+        self.next_draw_time = max(self.next_draw_time + interval, now - interval / 2)
+        self.last_draw_time = now
+        self.draw(draw_extra)
+        return True
+
     def run(self, bot, mode: str = "perform", render: bool = True, draw_extra: callable = None):
         update_timer = 0
-        update_interval = 1.0 / UPS
         first_frame = True
         is_heuristic_bot = getattr(bot, "is_heuristic", False)
         is_numpy_agent = bot.__class__.__name__.lower().find("numpy") != -1
@@ -40,58 +111,40 @@ class Game:
                 bot.set_mode("perform")
                 bot.load_model()
             while True:
-                frame_time = min(self.clock.tick(FPS) / 1000, dt_max)
-                update_timer += frame_time
-                # Use first_frame to update immediately (to avoid not being able to update before drawing)
-                while update_timer >= update_interval or first_frame:
-                    current_state = self.get_state(is_heuristic_bot)
-                    if is_numpy_agent:
-                        current_state = current_state.reshape(len(current_state), 1)
-                    action = bot.get_action(current_state)
-                    self.update(action)
-                    update_timer -= update_interval
-                    first_frame = False
+                if self.simulation_rate == SimulationRate.UNBOUNDED:
+                    # không chờ đồng hồ: cập nhật liên tục cho tới lúc cần vẽ frame tiếp theo
+                    frame_end = time.perf_counter() + 1 / FPS
+                    while time.perf_counter() < frame_end or first_frame:
+                        self.step_bot(bot, is_heuristic_bot, is_numpy_agent)
+                        first_frame = False
+                else:
+                    self.tick_budget = 1 / FPS
+                    frame_time = min(self.clock.tick(FPS) / 1000, dt_max)
+                    update_timer += frame_time
+                    update_interval = 1.0 / self.get_updates_per_second()
+                    # Use first_frame to update immediately (to avoid not being able to update before drawing)
+                    while update_timer >= update_interval or first_frame:
+                        self.step_bot(bot, is_heuristic_bot, is_numpy_agent)
+                        update_timer -= update_interval
+                        first_frame = False
                 if render:
-                    self.draw(draw_extra)
+                    self.render(draw_extra)
         else:
             bot.train(render)
-    def take_action(self, action: np.ndarray, render: bool = True): # for AI agent
+
+    def step_bot(self, bot, is_heuristic_bot: bool, is_numpy_agent: bool):
+        current_state = self.get_state(is_heuristic_bot)
+        if is_numpy_agent:
+            current_state = current_state.reshape(len(current_state), 1)
+        action = bot.get_action(current_state)
         self.update(action)
-        if render:
-            self.draw()
 
-    def get_state(self, is_heuristic: bool = False):
-        """
-        Get current game state as numpy array.
-        
-        Returns:
-            np.ndarray: Array with bullet and wall information:
-            - First N elements (N=8 or N=24): Indicate bullet presence in each region
-              - If USE_COMPLEX_SCANNING=False: 8 elements for 8 directions
-              - If USE_COMPLEX_SCANNING=True: 24 elements (8 directions x 3 distance rings)
-              - Value 1 means bullet present, 0 means no bullet
-            - Last 4 elements: Wall proximity flags [top, right, bottom, left]
-              - Value 1 means near wall, 0 means not near wall
-        """
-        if is_heuristic:
-            state = self.bullet_manager.get_bullet_in_range(SCAN_RADIUS)
-        else:
-            bullets_in_radius = self.bullet_manager.get_bullet_in_range(SCAN_RADIUS)
-            if USE_COMPLEX_SCANNING:
-                sector_flags = self.bullet_manager.get_complex_regions(bullets_in_radius)
-            else:
-                sector_flags = self.bullet_manager.get_simple_regions(bullets_in_radius)
-            near_wall_info = self.player.get_near_wall_info()
-            
-            # Combine states into single array
-            state = np.zeros(len(sector_flags) + len(near_wall_info), dtype=np.float64)
-            state[:len(sector_flags)] = sector_flags
-            state[len(sector_flags):] = near_wall_info
-            
-        return state
-    
-    def get_reward(self) -> tuple[float, bool]:
-        return self.reward if not self.game_over else -100.0, self.game_over
+    def take_action(self, action: np.ndarray, render: bool = True, repeat: int = 1) -> tuple[float, bool]: # for AI agent
+        result = super().take_action(action, repeat=repeat)
+        # chỉ vẽ frame cuối của các lần lặp, tối đa RENDER_FPS lần mỗi giây thực
+        if render:
+            self.render()
+        return result
 
     def check_events(self):
         for event in pygame.event.get():
@@ -100,51 +153,99 @@ class Game:
                 sys.exit()
             # self.bullet_manager.spawn_random_bullet_pattern(event)
 
-    def restart_game(self):
-        self.player.reset()
-        self.bullet_manager.reset(self.update_counter)
-        self.reward = 0.5
-        self.game_over = False
-        self.score = 0
+    def restart_game(self, seed: int = None):
+        super().restart_game(seed)
+        if self.player_trail is not None:
+            self.player_trail.clear()
+        self.full_redraw = True
         self.start_time = pygame.time.get_ticks()
 
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        if self.player_trail is not None:
+            self.player_trail.clear()
+        self.full_redraw = True
+        # đồng hồ thật tiếp tục từ thời gian sống đã lưu
+        self.start_time = pygame.time.get_ticks() - self.survival_time * 1000
+
     def update(self, action: np.ndarray = None):
-        self.update_counter += 1
         # update logic
-        self.check_events()
-        if not self.game_over:
-            self.player.update(action)
-            self.reward = 0.5 if not self.player.is_moving else 0.0 # reset every loop, only set to zero if move, -10 if got hit
-            if self.bullet_manager.key == 0:
-                self.bullet_manager.update(update_num=self.update_counter)
-            self.check_collision()
-            self.score += 1
-            self.survival_time = (pygame.time.get_ticks() - self.start_time) // 1000
+        unbounded = self.simulation_rate == SimulationRate.UNBOUNDED
+        if not unbounded:
+            self.check_events()
+        else:
+            # đọc event tốn thời gian: khi chạy không giới hạn chỉ đọc khoảng FPS lần mỗi giây thực
+            now = time.perf_counter()
+            if now >= self.next_event_time:
+                self.next_event_time = now + 1 / FPS
+                self.check_events()
+        if action is None:
+            action = self.get_keyboard_action()
+        game_over = self.game_over
+        super().update(action)
+        if not game_over:
+            # khi chạy không giới hạn, thời gian sống tính theo số tick (Simulation) thay vì đồng hồ thật
+            if not unbounded:
+                self.survival_time = (pygame.time.get_ticks() - self.start_time) // 1000
         else:
             keys = pygame.key.get_pressed()
             if keys[pygame.K_RETURN]:
                 self.restart_game()
 
-    def draw(self, draw_extra: callable = None):
-        # re-draw surface
-        self.surface.fill((0, 0, 0))
-        self.draw_box()
-        
+    def get_keyboard_action(self) -> np.ndarray:
+        """Convert the arrow keys currently pressed into a one-hot action (user keyboard input)."""
+        keys = pygame.key.get_pressed()
+        move_x = (keys[pygame.K_RIGHT] and not keys[pygame.K_LEFT]) - (keys[pygame.K_LEFT] and not keys[pygame.K_RIGHT])
+        move_y = (keys[pygame.K_DOWN] and not keys[pygame.K_UP]) - (keys[pygame.K_UP] and not keys[pygame.K_DOWN])
+        action = np.zeros(9, dtype=np.float64)
+        action[self.player.directions.index((move_x, move_y))] = 1
+        return action
+
+    def draw(self, draw_extra: callable = None, extra_radius: float = SCAN_RADIUS):
+        """
+        Draw a frame. With DIRTY_RECT_RENDERING only the areas drawn in the previous frame are erased
+        (from the static background) and only those and the areas drawn now are sent to the display.
+
+        Args:
+            draw_extra: Overlay drawn under the player and the bullets (bot vision)
+            extra_radius: Everything draw_extra draws is within this distance of the player
+        """
+        full = self.full_redraw or not DIRTY_RECT_RENDERING or len(self.dirty_rects) > DIRTY_RECTS_MAX
+        if full:
+            self.surface.blit(self.background, (0, 0))
+        else:
+            self.surface.blits([(self.background, rect, rect) for rect in self.dirty_rects], doreturn=False)
+
+        rects = []
         if draw_extra:
             draw_extra()
-            
-        self.player.draw()
-        self.bullet_manager.draw(self.surface)
+            margin = int(extra_radius) + 2
+            rects.append(pygame.Rect(int(self.player.x) - margin, int(self.player.y) - margin, 2 * margin, 2 * margin))
+
+        rects += self.draw_player()
+        rects += self.draw_bullets()
         # print(self.get_reward())
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
+        rects.append(self.draw_score())
+        if full or len(rects) > DIRTY_RECTS_MAX:
+            pygame.display.flip()
+        else:
+            # vùng cũ (đã xoá) và vùng mới
+            pygame.display.update(self.dirty_rects + rects)
+        self.dirty_rects = [rect.clip(self.screen_rect) for rect in rects]
+        self.full_redraw = False
+
+    def draw_score(self) -> pygame.Rect:
+        # chỉ render lại chữ khi điểm thay đổi
+        if self.score_text_value != self.score:
+            self.score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
+            self.score_text_value = self.score
         # time_text =  self.font.render(f"Time: {self.survival_time}s", True, (255, 255, 255))
-    
-        self.surface.blit(score_text, (10, 10))
+        return self.surface.blit(self.score_text, (10, 10))
         # self.surface.blit(time_text, (10, 40))
-        pygame.display.flip()
 
-    def draw_box(self):
-        pygame.draw.rect(self.surface, (255, 255, 255), (BOX_TOP, BOX_LEFT, BOX_SIZE, BOX_SIZE), 2)
+    def draw_box(self, surface: pygame.Surface = None):
+        surface = surface if surface is not None else self.surface
+        pygame.draw.rect(surface, (255, 255, 255), (BOX_TOP, BOX_LEFT, BOX_SIZE, BOX_SIZE), 2)
 
     def show_game_over_screen(self):
         text = self.font.render("Game Over", True, (255, 0, 0))
@@ -153,14 +254,111 @@ class Game:
         self.surface.fill((0, 0, 0))
         self.surface.blit(text, text_rect)
         pygame.display.flip()
+        self.full_redraw = True
 
         # time.sleep(2)  # Dừng game trong 2 giây
         self.restart_game()
 
-    def check_collision(self):
-        # if colision restart game
-        for bullet in self.bullet_manager.bullets:
-            distance = math.sqrt((self.player.x - bullet.x) ** 2 + (self.player.y - bullet.y) ** 2)
-            if distance <= self.player.radius + bullet.radius:
-                self.game_over = True
-                break
\ No newline at end of file
+    def draw_player(self) -> list[pygame.Rect]:
+        """Draw the player (and its trail). Returns the areas drawn."""
+        player = self.player
+        rects = []
+        if DynamicConfig.DISPLAY_PLAYER_TRAIL and self.player_trail is not None:
+            self.player_trail.append((player.x, player.y))
+            if len(self.player_trail) >= 2:
+                rect = draw_water_drop_at(self.surface, player.x, player.y, player.radius, player.color, self.player_trail[0])
+                if rect is not None:
+                    rects.append(rect)
+        rects.append(pygame.draw.circle(self.surface, player.color, (player.x, player.y), player.radius))
+        return rects
+
+    def bullet_sprite(self, radius: int, color: tuple) -> pygame.Surface:
+        """Surface of one bullet (the circle pygame.draw.circle would draw), made once per (radius, color)."""
+        sprite = self.bullet_sprites.get((radius, color))
+        if sprite is None:
+            colorkey = (0, 0, 0) if color != (0, 0, 0) else (255, 255, 255)
+            sprite = pygame.Surface((2 * radius, 2 * radius)).convert()
+            sprite.fill(colorkey)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+            self.bullet_sprites[(radius, color)] = sprite
+        return sprite
+
+    def trail_sprite(self, radius: int, color: tuple, dx: int, dy: int) -> tuple[pygame.Surface, int, int]:
+        """
+        Surface of one bullet trail (the triangle draw_water_drop_at would draw from a tail at (0, 0)
+        to a bullet at (dx, dy)), made once per (radius, color, dx, dy).
+
+        Returns:
+            (sprite, left, top): the sprite and the offset of its top left corner from the tail
+        """
+        key = (radius, color, dx, dy)
+        entry = self.trail_sprites.get(key)
+        if entry is None:
+            if len(self.trail_sprites) >= TRAIL_SPRITES_MAX:
+                self.trail_sprites.clear()
+            _, points = water_drop_polygons(np.array([dx], dtype=np.float64), np.array([dy], dtype=np.float64),
+                                            np.array([radius], dtype=np.float64), np.zeros(1), np.zeros(1))
+            points = points[0]
+            left, top = np.floor(points.min(axis=0)).astype(int).tolist()
+            right, bottom = np.ceil(points.max(axis=0)).astype(int).tolist()
+            colorkey = (0, 0, 0) if color != (0, 0, 0) else (255, 255, 255)
+            sprite = pygame.Surface((right - left + 1, bottom - top + 1)).convert()
+            sprite.fill(colorkey)
+            # dịch theo số nguyên nên phần lẻ của các đỉnh (và cách pygame làm tròn) giữ nguyên
+            pygame.draw.polygon(sprite, color, (points - (left, top)).tolist())
+            sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+            entry = self.trail_sprites[key] = (sprite, left, top)
+        return entry
+
+    def trail_blits(self) -> list[tuple[pygame.Surface, tuple[int, int]]]:
+        """(sprite, position) of every bullet trail, in the order of the bullets."""
+        bullets = self.bullet_manager.bullets
+        bullets.record_trail()
+        tails, lengths = bullets.trail_tail()
+        with_trail = np.flatnonzero(lengths >= 2)
+        # đuôi và vector đuôi -> đạn làm tròn tới pixel: các viên cùng vận tốc dùng chung một sprite
+        tail_x, tail_y = tails[with_trail, 0], tails[with_trail, 1]
+        dx = np.rint(bullets.x[with_trail] - tail_x).astype(np.intp)
+        dy = np.rint(bullets.y[with_trail] - tail_y).astype(np.intp)
+        tail_x = np.rint(tail_x).astype(np.intp)
+        tail_y = np.rint(tail_y).astype(np.intp)
+        radius = bullets.radius[with_trail].astype(np.intp)
+        drawn = np.flatnonzero(dx * dx + dy * dy > radius * radius)
+        if len(drawn) == 0:
+            return []
+        tail_x, tail_y, dx, dy, radius = tail_x[drawn], tail_y[drawn], dx[drawn], dy[drawn], radius[drawn]
+        color = bullets.color[with_trail[drawn]].astype(np.int64) // 2
+        # dx, dy nhỏ hơn kích thước màn hình nên vừa 12 bit (có dấu, cộng thêm 2048)
+        keys, sprite_index = np.unique((radius.astype(np.int64) << 48) | (color[:, 0] << 40) | (color[:, 1] << 32) | (color[:, 2] << 24)
+                                       | ((dx + 2048) << 12) | (dy + 2048), return_inverse=True)
+        entries = [self.trail_sprite(key >> 48, (key >> 40 & 255, key >> 32 & 255, key >> 24 & 255), (key >> 12 & 4095) - 2048, (key & 4095) - 2048)
+                   for key in keys.tolist()]
+        offsets = np.array([(left, top) for _, left, top in entries], dtype=np.intp)[sprite_index]
+        sprites = [sprite for sprite, _, _ in entries]
+        return list(zip(map(sprites.__getitem__, sprite_index.tolist()),
+                        zip((tail_x + offsets[:, 0]).tolist(), (tail_y + offsets[:, 1]).tolist())))
+
+    def draw_bullets(self) -> list[pygame.Rect]:
+        """Draw the bullets (and their trails). Returns the areas drawn."""
+        bullets = self.bullet_manager.bullets
+        n = bullets.size
+        # vệt đạn và đạn đều là sprite vẽ sẵn, blit hết trong một lần gọi Surface.blits (vệt trước, đạn sau)
+        trails = []
+        if DynamicConfig.DISPLAY_BULLET_TRAIL and bullets.trail is not None:
+            trails = self.trail_blits()
+        if n == 0:
+            return []
+
+        # mỗi (bán kính, màu) một sprite vẽ sẵn
+        radius = bullets.radius.astype(np.intp)
+        left = bullets.x.astype(np.intp) - radius
+        top = bullets.y.astype(np.intp) - radius
+        color = bullets.color[:n].astype(np.intp)
+        keys, sprite_index = np.unique((radius << 24) | (color[:, 0] << 16) | (color[:, 1] << 8) | color[:, 2], return_inverse=True)
+        sprites = [self.bullet_sprite(key >> 24, (key >> 16 & 255, key >> 8 & 255, key & 255)) for key in keys.tolist()]
+        bullet_blits = zip(map(sprites.__getitem__, sprite_index.tolist()), zip(left.tolist(), top.tolist()))
+        return self.surface.blits(itertools.chain(trails, bullet_blits))
+
+    def draw_surround_circle(self, radius: float):
+        pygame.draw.circle(self.surface, (255, 255, 255), (int(self.player.x), int(self.player.y)), radius, 1)
@@ -0,0 +1,78 @@
+import numpy as np
+from configs.bot_config import USE_COMPLEX_SCANNING, SCAN_RADIUS, USE_NEAREST_BULLETS_STATE, NUM_NEAREST_BULLETS
+from game.state_encoder import BULLET_STATE_SIZE, NEAREST_BULLET_FEATURES, STATE_SIZE, encode_nearest
+
+class Observation:
+    """
+    What the player sees at one tick: bullets in the scan circle, region flags, nearest bullets and wall flags.
+
+    Every value is computed on first use and then served to every consumer of the same tick
+    (get_state, the heuristic bots, the vision overlays). Get it with `Simulation.observe()`,
+    which starts a new one whenever `update_counter` changes.
+    """
+
+    def __init__(self, game: "Simulation"):
+        self.game = game
+        self.tick = game.update_counter
+        self.values = {}
+
+    def cached(self, key: tuple, compute: callable):
+        value = self.values.get(key)
+        if value is None:
+            value = self.values[key] = compute()
+        return value
+
+    def bullets_in_range(self, end_radius: float = SCAN_RADIUS, start_radius: float = 0) -> np.ndarray:
+        """Indices of the bullets between start_radius and end_radius of the player (see BulletManager.get_bullet_in_range)."""
+        return self.cached(("in_range", end_radius, start_radius),
+                           lambda: self.game.bullet_manager.get_bullet_in_range(end_radius, start_radius))
+
+    def simple_regions(self, radius: float = SCAN_RADIUS) -> np.ndarray:
+        return self.cached(("simple_regions", radius),
+                           lambda: self.game.bullet_manager.get_simple_regions(self.bullets_in_range(radius)))
+
+    def complex_regions(self, radius: float = SCAN_RADIUS, num_angle_divisions: int = 8,
+                        num_radius_divisions: int = 3) -> np.ndarray:
+        return self.cached(("complex_regions", radius, num_angle_divisions, num_radius_divisions),
+                           lambda: self.game.bullet_manager.get_complex_regions(
+                               self.bullets_in_range(radius), num_angle_divisions, num_radius_divisions))
+
+    def nearest_bullets(self, num_bullets: int = NUM_NEAREST_BULLETS) -> np.ndarray:
+        """Indices of the `num_bullets` bullets closest to the player, closest first (see BulletManager.get_nearest_bullets)."""
+        return self.cached(("nearest", num_bullets), lambda: self.game.bullet_manager.get_nearest_bullets(num_bullets))
+
+    def wall_flags(self) -> list[int]:
+        return self.cached(("wall_flags",), self.game.player.get_near_wall_info)
+
+    def state(self) -> np.ndarray:
+        """The model input of Simulation.get_state(is_heuristic=False). Read-only: copy it before changing it."""
+        return self.cached(("state",), self.encode_state)
+
+    def encode_state(self) -> np.ndarray:
+        # phần đạn được ghi thẳng vào đầu của state, không qua list trung gian
+        state = np.zeros(STATE_SIZE, dtype=np.float64)
+        if USE_NEAREST_BULLETS_STATE:
+            self.encode_nearest(state[:BULLET_STATE_SIZE].reshape(NUM_NEAREST_BULLETS, NEAREST_BULLET_FEATURES))
+        else:
+            self.encode_regions(state[:BULLET_STATE_SIZE])
+        state[BULLET_STATE_SIZE:] = self.wall_flags()
+        state.flags.writeable = False
+        return state
+
+    def encode_regions(self, regions: np.ndarray):
+        if USE_COMPLEX_SCANNING:
+            key, encode = ("complex_regions", SCAN_RADIUS, 8, 3), self.game.bullet_manager.get_complex_regions
+        else:
+            key, encode = ("simple_regions", SCAN_RADIUS), self.game.bullet_manager.get_simple_regions
+        if key in self.values:
+            regions[:] = self.values[key]
+        else:
+            # overlay của cùng tick dùng lại phần này của state
+            self.values[key] = encode(self.bullets_in_range(), out=regions)
+
+    def encode_nearest(self, out: np.ndarray):
+        bullet_manager = self.game.bullet_manager
+        nearest = self.nearest_bullets()
+        dx, dy = bullet_manager.offsets(nearest)
+        bullets = bullet_manager.bullets
+        encode_nearest(dx, dy, bullets.vx[nearest], bullets.vy[nearest], out)
@@ -1,122 +1,100 @@
-import pygame
 import math
 import numpy as np
-from collections import deque
+from collections import namedtuple
 from configs.game_config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, BOX_SIZE, BOX_LEFT, BOX_TOP,
-    PLAYER_SPEED, DISPLAY_PLAYER_TRAIL, TRAIL_MAX_LENGTH, UPDATE_DELTA_TIME)
+    PLAYER_SPEED, UPDATE_DELTA_TIME)
 from configs.bot_config import WALL_CLOSE_RANGE
-from utils.draw_utils import draw_water_drop
-from configs.game_config import DynamicConfig
 
-class Player(pygame.sprite.Sprite):
-    
+# thay cho pygame.Vector2 để lõi mô phỏng không phụ thuộc pygame
+Vector2 = namedtuple("Vector2", ["x", "y"])
+
+class Player:
+
     # optimize
     SQRT_2 = math.sqrt(2)
-    
-    def __init__(self, surface: pygame.Surface):
-        super().__init__() #kế thừa lớp con từ lớp cha
-        self.surface = surface
+
+    def __init__(self):
         self.directions = [
-            pygame.Vector2(1, 0),   # Phải
-            pygame.Vector2(1, -1),  # Phải - Lên
-            pygame.Vector2(0, -1),  # Lên
-            pygame.Vector2(-1, -1), # Trái - Lên
-            pygame.Vector2(-1, 0),  # Trái
-            pygame.Vector2(-1, 1),  # Trái - Xuống
-            pygame.Vector2(0, 1),   # Xuống
-            pygame.Vector2(1, 1),    # Phải - Xuống
-            pygame.Vector2(0, 0)   # Đứng yên
+            Vector2(1, 0),   # Phải
+            Vector2(1, -1),  # Phải - Lên
+            Vector2(0, -1),  # Lên
+            Vector2(-1, -1), # Trái - Lên
+            Vector2(-1, 0),  # Trái
+            Vector2(-1, 1),  # Trái - Xuống
+            Vector2(0, 1),   # Xuống
+            Vector2(1, 1),   # Phải - Xuống
+            Vector2(0, 0)    # Đứng yên
         ]
-        self.direction = pygame.Vector2(0,0)
+        self.direction = Vector2(0, 0)
         self.radius = 5
         self.color = (255, 0, 0)
         self.speed = PLAYER_SPEED
         self.x = SCREEN_WIDTH // 2
         self.y = SCREEN_HEIGHT // 2
         self.is_moving = False
-        
-        self.trail = deque(maxlen=TRAIL_MAX_LENGTH)  if DISPLAY_PLAYER_TRAIL else None
-        
-    def draw(self):
-        if DynamicConfig.DISPLAY_PLAYER_TRAIL and self.trail is not None:
-            self.trail.append((self.x, self.y))
-            draw_water_drop(self.surface, self)
-        pygame.draw.circle(self.surface, self.color, (self.x,self.y), self.radius)
-
-    def draw_surround_circle(self, radius: float):
-        pygame.draw.circle(self.surface, (255, 255, 255), (int(self.x), int(self.y)), radius, 1)
-        
-    def update(self, action: np.ndarray):
-        self.move(action)
-    
+
+    def update(self, action: np.ndarray, delta_time: float = UPDATE_DELTA_TIME):
+        self.move(action, delta_time)
+
     def reset(self):
         self.x = SCREEN_WIDTH // 2
         self.y = SCREEN_HEIGHT // 2
-        self.direction = pygame.Vector2(0, 0)
+        self.direction = Vector2(0, 0)
         self.is_moving = False
-        if DISPLAY_PLAYER_TRAIL:
-            self.trail.clear()
-        
+
+    def snapshot(self) -> tuple:
+        return self.x, self.y, self.direction, self.is_moving
+
+    def restore(self, snapshot: tuple):
+        self.x, self.y, self.direction, self.is_moving = snapshot
+
     def set_movement_from_index(self, action: int):
         self.direction = self.directions[action]
-    
-    def input(self):
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and not keys[pygame.K_RIGHT]:
-            self.direction.x = -1
-        elif keys[pygame.K_RIGHT] and not keys[pygame.K_LEFT]:
-            self.direction.x = 1
-        else: self.direction.x = 0 
-        if keys[pygame.K_UP] and not keys[pygame.K_DOWN]:
-            self.direction.y = -1
-        elif keys[pygame.K_DOWN] and not keys[pygame.K_UP]:
-            self.direction.y = 1
-        else: self.direction.y = 0
-        
-    def direction_to_position(self, direction: pygame.Vector2) -> pygame.Vector2:
+
+    def direction_to_position(self, direction: Vector2, delta_time: float = UPDATE_DELTA_TIME) -> Vector2:
         if direction.x and direction.y:
-            x = self.x + direction.x * PLAYER_SPEED * UPDATE_DELTA_TIME / self.SQRT_2
-            y = self.y + direction.y * PLAYER_SPEED * UPDATE_DELTA_TIME / self.SQRT_2
+            x = self.x + direction.x * PLAYER_SPEED * delta_time / self.SQRT_2
+            y = self.y + direction.y * PLAYER_SPEED * delta_time / self.SQRT_2
         else:
-            x = self.x + direction.x * PLAYER_SPEED * UPDATE_DELTA_TIME
-            y = self.y + direction.y * PLAYER_SPEED * UPDATE_DELTA_TIME
-        
+            x = self.x + direction.x * PLAYER_SPEED * delta_time
+            y = self.y + direction.y * PLAYER_SPEED * delta_time
+
         x, y = self.handle_screen_collision(x, y)
 
-        return pygame.Vector2(x, y)
-        
-    def move(self, action: np.ndarray = None):
+        return Vector2(x, y)
+
+    def move(self, action: np.ndarray = None, delta_time: float = UPDATE_DELTA_TIME):
         if action is None:
-            # user keyboard input
-            self.input()
+            # không có hành động (vd: bot tắt) -> đứng yên; bàn phím do Game chuyển thành action
+            self.direction = self.directions[8]
         else:
             self.set_movement_from_index(np.argmax(action))
-            
+
         if self.direction.x or self.direction.y:
             self.is_moving = True
 
-        self.x, self.y = self.direction_to_position(self.direction)
-        
+        self.x, self.y = self.direction_to_position(self.direction, delta_time)
+
     def handle_screen_collision(self, x, y):
         """Ngăn hình tròn đi ra ngoài màn hình"""
-            
+
         left = BOX_LEFT
         top = BOX_TOP
         right = BOX_LEFT + BOX_SIZE
         bottom = BOX_TOP + BOX_SIZE
 
         if x - self.radius < left:
-           x = left + self.radius  
+           x = left + self.radius
         if x + self.radius > right:
-           x = right - self.radius  
+           x = right - self.radius
         if y - self.radius < top:
-           y = top + self.radius  
+           y = top + self.radius
         if y + self.radius > bottom:
            y = bottom - self.radius
 
         return x, y
-    
+
     def get_near_wall_info(self):
         """
         Determines whether the player is near any of the four walls of the game area.
@@ -126,7 +104,7 @@ class Player(pygame.sprite.Sprite):
 
         Returns:
             list[int]: A list of four integers (0 or 1) representing proximity to walls:
-        
+
         Index mapping:
             0: Near top box boarder
             1: Near right box boarder
@@ -144,4 +122,4 @@ class Player(pygame.sprite.Sprite):
         if self.x - BOX_LEFT < WALL_CLOSE_RANGE:
             result[3] = 1
 
-        return result
\ No newline at end of file
+        return result
@@ -0,0 +1,95 @@
+import numpy as np
+from configs.game_config import SCREEN_WIDTH, SCREEN_HEIGHT, BOX_LEFT, BOX_TOP, BOX_SIZE
+from configs.bot_config import IMG_SIZE
+
+BOX_LINE_WIDTH = 2  # như pygame.draw.rect(..., 2) của Game.draw_box
+
+def gray_scale(color: np.ndarray) -> np.ndarray:
+    """Grayscale (0-255) of RGB colors, same weights as the old screenshot conversion."""
+    color = np.asarray(color, dtype=np.float64)
+    return np.rint(color @ np.array([0.299, 0.587, 0.114])).astype(np.uint8)
+
+class Rasterizer:
+    """
+    Headless drawing of the square patch around the player that the vision agents look at.
+
+    Draws what Game.draw puts on the screen (box outline, player, then bullets on top) straight
+    from the bullet arrays, in grayscale, without pygame or a window: the static box is drawn
+    once into a screen-sized layer, and each bullet touching the patch is stamped with a disc
+    cached per radius. Replaces the window capture of utils.bot_helper.get_screen_shot_gray_scale.
+    """
+
+    def __init__(self, img_size: int = IMG_SIZE):
+        self.img_size = img_size
+        self.stencils = {}
+
+        # lớp tĩnh cỡ màn hình, có viền img_size quanh màn hình để patch gần mép không cần kẹp
+        pad = img_size
+        self.static = np.zeros((SCREEN_HEIGHT + 2 * pad, SCREEN_WIDTH + 2 * pad), dtype=np.uint8)
+        left, top = int(BOX_LEFT) + pad, int(BOX_TOP) + pad
+        right, bottom = left + BOX_SIZE, top + BOX_SIZE
+        self.static[top:top + BOX_LINE_WIDTH, left:right] = 255
+        self.static[bottom - BOX_LINE_WIDTH:bottom, left:right] = 255
+        self.static[top:bottom, left:left + BOX_LINE_WIDTH] = 255
+        self.static[top:bottom, right - BOX_LINE_WIDTH:right] = 255
+
+    def stencil(self, radius: int) -> np.ndarray:
+        """
+        Boolean disc of `radius` pixels, shape (2 * radius, 2 * radius), starting `radius` pixels
+        before its center, like pygame.draw.circle (pixel for pixel up to radius 5).
+        """
+        disc = self.stencils.get(radius)
+        if disc is None:
+            offset = np.arange(-radius, radius) + 0.5
+            # tâm pixel cách tâm đường tròn < radius - 1/4: khớp thuật toán vẽ của pygame với các bán kính nhỏ
+            disc = self.stencils[radius] = offset[:, None] ** 2 + offset[None, :] ** 2 <= (radius - 0.25) ** 2
+        return disc
+
+    def stamp(self, out: np.ndarray, center_x: int, center_y: int, radius: int, value: int):
+        """Draw a filled disc into `out`, (center_x, center_y) in patch pixels; the part outside the patch is dropped."""
+        size = self.img_size
+        left, top = center_x - radius, center_y - radius
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + 2 * radius, size), min(top + 2 * radius, size)
+        if x0 >= x1 or y0 >= y1:
+            return
+        disc = self.stencil(radius)[y0 - top:y1 - top, x0 - left:x1 - left]
+        out[y0:y1, x0:x1][disc] = value
+
+    def render(self, game: "Simulation", out: np.ndarray = None) -> np.ndarray:
+        """
+        Draw the patch centred on the player of `game` (a Simulation or a Game).
+
+        The patch starts at (int(player.x - img_size / 2), int(player.y - img_size / 2)) like the old screenshot.
+
+        Args:
+            out: Preallocated uint8 image (img_size, img_size). None allocates it
+
+        Returns:
+            np.ndarray: `out`, grayscale 0-255, row-major (out.reshape(-1) matches the old screenshot order)
+        """
+        size = self.img_size
+        if out is None:
+            out = np.empty((size, size), dtype=np.uint8)
+        player = game.player
+        origin_x = int(player.x - size / 2)
+        origin_y = int(player.y - size / 2)
+        out[:] = self.static[origin_y + size:origin_y + 2 * size, origin_x + size:origin_x + 2 * size]
+
+        self.stamp(out, int(player.x) - origin_x, int(player.y) - origin_y, int(player.radius),
+                   gray_scale(player.color))
+
+        # chỉ các viên có hình vuông bao chạm patch (lọc vector hoá), rồi đóng dấu theo thứ tự vẽ
+        bullets = game.bullet_manager.bullets
+        n = bullets.size
+        if n:
+            x = bullets.x.astype(np.intp) - origin_x
+            y = bullets.y.astype(np.intp) - origin_y
+            radius = bullets.radius.astype(np.intp)
+            visible = np.flatnonzero((x + radius >= 0) & (x - radius < size) & (y + radius >= 0) & (y - radius < size))
+            if visible.size:
+                values = gray_scale(bullets.color[visible])
+                for bullet_x, bullet_y, bullet_radius, value in zip(x[visible].tolist(), y[visible].tolist(),
+                                                                    radius[visible].tolist(), values.tolist()):
+                    self.stamp(out, bullet_x, bullet_y, bullet_radius, value)
+        return out
@@ -0,0 +1,172 @@
+import random
+import numpy as np
+from collections import namedtuple
+from configs.game_config import UPDATE_DELTA_TIME, CONTINUOUS_COLLISION
+from configs.bot_config import SCAN_RADIUS
+from game.bullet_manager import BulletManager
+from game.collision import swept_distance_square
+from game.observation import Observation
+from game.player import Player
+
+GameSnapshot = namedtuple("GameSnapshot", [
+    "update_counter", "score", "survival_time", "reward", "game_over", "hit_bullet_index", "closest_approach",
+    "player", "bullet_manager", "random_state"])
+
+class Simulation:
+    """
+    Headless game kernel: player, bullets, spawning, collision, reward and state.
+
+    It does not import pygame, so training and benchmark workers can step games without
+    SDL or a window. `game.game_core.Game` renders on top of it for watching and playing.
+    """
+
+    def __init__(self, seed: int = None, update_ticks: int = 1, continuous_collision: bool = CONTINUOUS_COLLISION):
+        """
+        Args:
+            seed: Seed of the game's own random stream (bullet spawning). None: unseeded
+            update_ticks: Number of UPDATE_DELTA_TIME ticks covered by one update (the spawn schedule
+                          still runs for every tick). Use with continuous_collision when above 1
+            continuous_collision: Test the paths swept by the player and the bullets during the update
+                                  instead of their end positions only, so nothing tunnels through the player
+        """
+        self.update_ticks = update_ticks
+        self.delta_time = update_ticks * UPDATE_DELTA_TIME
+        self.continuous_collision = continuous_collision
+        self.update_counter = 0
+        self.observation = None
+        self.last_action = None  # hành động của lần cập nhật gần nhất (để vẽ quyết định của bot)
+        self.random = random.Random(seed)
+        self.player = Player()
+        self.bullet_manager = BulletManager(self.player, rng=self.random)
+        self.restart_game()
+
+    def take_action(self, action: np.ndarray, render: bool = False, repeat: int = 1) -> tuple[float, bool]: # for AI agent
+        """
+        Apply `action` for `repeat` updates (frame skip), stopping early when the player is hit.
+        `render` is ignored: there is nothing to draw headless.
+
+        Returns:
+            tuple[float, bool]: Reward summed over the updates played (see get_reward), game over
+        """
+        if repeat < 1:
+            raise ValueError(f"repeat must be at least 1, got {repeat}")
+        total_reward = 0.0
+        for _ in range(repeat):
+            self.update(action)
+            reward, game_over = self.get_reward()
+            total_reward += reward
+            if game_over:
+                break
+        return total_reward, game_over
+
+    def get_state(self, is_heuristic: bool = False):
+        """
+        Get current game state as numpy array.
+
+        Returns:
+            np.ndarray: Array with bullet and wall information:
+            - First N elements (N=8 or N=24): Indicate bullet presence in each region
+              - If USE_COMPLEX_SCANNING=False: 8 elements for 8 directions
+              - If USE_COMPLEX_SCANNING=True: 24 elements (8 directions x 3 distance rings)
+              - Value 1 means bullet present, 0 means no bullet
+              - If USE_NEAREST_BULLETS_STATE=True: instead, NUM_NEAREST_BULLETS rows of
+                [present, dx, dy, vx, vy] for the closest bullets, closest first, zero padded
+                (see state_encoder.encode_nearest)
+            - Last 4 elements: Wall proximity flags [top, right, bottom, left]
+              - Value 1 means near wall, 0 means not near wall
+            Its length is state_encoder.STATE_SIZE.
+        """
+        observation = self.observe()
+        if is_heuristic:
+            return observation.bullets_in_range(SCAN_RADIUS)
+        return observation.state().copy()
+
+    def observe(self) -> Observation:
+        """The observation cache of the current tick, shared by get_state, bots and overlays."""
+        if self.observation is None or self.observation.tick != self.update_counter:
+            self.observation = Observation(self)
+        return self.observation
+
+    def get_reward(self) -> tuple[float, bool]:
+        return self.reward if not self.game_over else -100.0, self.game_over
+
+    def restart_game(self, seed: int = None):
+        """Start a new episode. With a `seed`, the episode is the same every time that seed is used."""
+        if seed is not None:
+            self.random.seed(seed)
+        self.player.reset()
+        self.player_start = (self.player.x, self.player.y)
+        self.observation = None
+        self.bullet_manager.reset(self.update_counter)
+        self.reward = 0.5
+        self.game_over = False
+        self.hit_bullet_index = -1
+        self.closest_approach = float("inf")
+        self.score = 0
+        self.survival_time = 0
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Capture the whole game (player, bullet arrays, spawn schedule, counters and RNG state)
+        so a planner can branch from here with `restore`. A snapshot can be restored any number of times.
+        """
+        return GameSnapshot(
+            self.update_counter, self.score, self.survival_time, self.reward, self.game_over,
+            self.hit_bullet_index, self.closest_approach,
+            self.player.snapshot(), self.bullet_manager.snapshot(), self.random.getstate())
+
+    def restore(self, snapshot: GameSnapshot):
+        (self.update_counter, self.score, self.survival_time, self.reward, self.game_over,
+         self.hit_bullet_index, self.closest_approach, player, bullet_manager, random_state) = snapshot
+        self.player.restore(player)
+        self.bullet_manager.restore(bullet_manager)
+        self.random.setstate(random_state)
+        self.observation = None
+
+    def update(self, action: np.ndarray = None):
+        self.update_counter += self.update_ticks
+        self.last_action = action
+        if not self.game_over:
+            self.player_start = (self.player.x, self.player.y)
+            self.player.update(action, self.delta_time)
+            self.reward = 0.5 if not self.player.is_moving else 0.0 # reset every loop, only set to zero if move, -10 if got hit
+            if self.bullet_manager.key == 0:
+                self.bullet_manager.update(update_num=self.update_counter, num_ticks=self.update_ticks)
+            self.check_collision()
+            self.score += self.update_ticks
+            self.survival_time = int(self.score * UPDATE_DELTA_TIME)
+
+    def check_collision(self) -> tuple[int, float]:
+        """
+        Test the player against every bullet in one batched operation.
+        With continuous_collision, the closest distance over the whole update is tested
+        (player moving in a straight line, bullets along their path, bounces included).
+
+        Returns:
+            tuple[int, float]:
+            - Index (in bullet_manager.bullets) of the first bullet touching the player, -1 if none
+            - Closest approach this tick: smallest gap between the player's edge and a bullet's edge
+              (<= 0 when touching, inf when there is no bullet)
+        """
+        bullets = self.bullet_manager.bullets
+        self.hit_bullet_index = -1
+        self.closest_approach = float("inf")
+        if bullets.size == 0:
+            return self.hit_bullet_index, self.closest_approach
+
+        dx = bullets.x - self.player.x
+        dy = bullets.y - self.player.y
+        if self.continuous_collision:
+            start_x, start_y = self.player_start
+            distance_square = swept_distance_square(dx, dy, bullets.vx, bullets.vy, bullets.bounce_time_x, bullets.bounce_time_y,
+                                                    self.delta_time, self.player.x - start_x, self.player.y - start_y)
+        else:
+            distance_square = dx ** 2 + dy ** 2
+        touch_distance = bullets.radius + self.player.radius
+        hits = np.flatnonzero(distance_square <= touch_distance * touch_distance)
+        if hits.size:
+            # if colision restart game
+            self.hit_bullet_index = int(hits[0])
+            self.game_over = True
+        self.closest_approach = float(np.min(np.sqrt(distance_square) - touch_distance))
+        return self.hit_bullet_index, self.closest_approach
@@ -0,0 +1,144 @@
+import math
+import numpy as np
+from configs.game_config import BOX_LEFT, BOX_TOP, BOX_SIZE, DEFAULT_BULLET_SPEED
+from configs.bot_config import (
+    SCAN_RADIUS, WALL_CLOSE_RANGE, USE_COMPLEX_SCANNING, USE_NEAREST_BULLETS_STATE, NUM_NEAREST_BULLETS)
+
+NUM_REGIONS = 24 if USE_COMPLEX_SCANNING else 8
+NEAREST_BULLET_FEATURES = 5    # [có đạn, dx, dy, vx, vy]
+# phần đạn của state: các cờ vùng hoặc K viên gần nhất, theo sau là 4 cờ tường
+BULLET_STATE_SIZE = NUM_NEAREST_BULLETS * NEAREST_BULLET_FEATURES if USE_NEAREST_BULLETS_STATE else NUM_REGIONS
+STATE_SIZE = BULLET_STATE_SIZE + 4
+
+def region_indices(dx: np.ndarray, dy: np.ndarray, complex_scanning: bool,
+                   num_angle_divisions: int = 8, num_radius_divisions: int = 3, radius: float = SCAN_RADIUS,
+                   return_distance: bool = False) -> tuple[np.ndarray, ...]:
+    """
+    Vectorized region index of many bullets (angle sector, and distance ring with complex scanning).
+
+    Args:
+        dx, dy: Bullet position relative to its player (bullet - player)
+        complex_scanning: Also split the scan circle into `num_radius_divisions` rings
+        radius: Radius of the scan circle
+        return_distance: Also return the distance of the bullets in range
+
+    Returns:
+        (in_range, region[, distance]): mask of the bullets inside the scan circle and, for those
+        bullets, the region index (ring * num_angle_divisions + angle_index) and distance
+    """
+    # ít lệnh numpy nhất có thể, ghi đè tại chỗ: với vài viên đạn, chi phí cố định mỗi lệnh chiếm phần lớn
+    distance_square = dx * dx
+    distance_square += dy * dy
+    if complex_scanning:
+        in_range = distance_square < radius * radius
+    else:
+        in_range = distance_square <= radius * radius
+
+    # góc tính theo đơn vị sector, lệch nửa sector để sector 0 nằm giữa góc 0 (y màn hình hướng xuống: góc là -atan2(dy, dx)),
+    # cộng thêm num_angle_divisions để luôn dương
+    sector = np.arctan2(dy, dx)
+    sector *= -num_angle_divisions / (2 * math.pi)
+    sector += num_angle_divisions + 0.5
+    np.fmod(sector, num_angle_divisions, out=sector)
+    region = sector.astype(np.intp)
+    if complex_scanning:
+        # vòng = số mốc (k * radius / num_radius_divisions)^2 không lớn hơn khoảng cách bình phương
+        ring = np.searchsorted(ring_thresholds(radius, num_radius_divisions), distance_square, side="right")
+        ring *= num_angle_divisions
+        region += ring
+    region = region[in_range]
+
+    if return_distance:
+        return in_range, region, np.sqrt(distance_square[in_range])
+    return in_range, region
+
+_ring_thresholds = {}
+
+def ring_thresholds(radius: float, num_radius_divisions: int) -> np.ndarray:
+    """Squared inner radius of rings 1..num_radius_divisions-1 of the scan circle, computed once."""
+    thresholds = _ring_thresholds.get((radius, num_radius_divisions))
+    if thresholds is None:
+        thresholds = _ring_thresholds[(radius, num_radius_divisions)] = \
+            (np.arange(1, num_radius_divisions) * (radius / num_radius_divisions)) ** 2
+    return thresholds
+
+def encode_regions(dx: np.ndarray, dy: np.ndarray, out: np.ndarray, complex_scanning: bool,
+                   num_angle_divisions: int = 8, num_radius_divisions: int = 3, radius: float = SCAN_RADIUS,
+                   counts: np.ndarray = None, nearest: np.ndarray = None) -> np.ndarray:
+    """
+    Region occupancy flags of one player's bullets, written into the preallocated `out`
+    (length num_angle_divisions, times num_radius_divisions with complex scanning).
+
+    The flags come from a single bincount of the region indices, which also gives the optional
+    `counts` channel (bullets per region) for free; `nearest` receives the distance of the
+    closest bullet of each region (inf when empty).
+
+    Returns:
+        np.ndarray: `out`
+    """
+    if nearest is not None:
+        nearest.fill(np.inf)
+    if len(dx) == 0:
+        out.fill(0)
+        if counts is not None:
+            counts.fill(0)
+        return out
+
+    if nearest is None:
+        in_range, region = region_indices(dx, dy, complex_scanning, num_angle_divisions, num_radius_divisions, radius)
+    else:
+        in_range, region, distance = region_indices(dx, dy, complex_scanning, num_angle_divisions,
+                                                    num_radius_divisions, radius, return_distance=True)
+    count = np.bincount(region, minlength=len(out))
+    np.greater(count, 0, out=out, casting="unsafe")
+    if counts is not None:
+        counts[:] = count
+    if nearest is not None:
+        np.minimum.at(nearest, region, distance)
+    return out
+
+def nearest_indices(distance_square: np.ndarray, num_bullets: int) -> np.ndarray:
+    """
+    Positions of the `num_bullets` smallest values of `distance_square`, closest first.
+
+    np.argpartition picks them in O(N) whatever `num_bullets` is; only those few are then sorted.
+    """
+    if len(distance_square) > num_bullets:
+        nearest = np.argpartition(distance_square, num_bullets - 1)[:num_bullets]
+    else:
+        nearest = np.arange(len(distance_square))
+    return nearest[np.argsort(distance_square[nearest], kind="stable")]
+
+def encode_nearest(dx: np.ndarray, dy: np.ndarray, vx: np.ndarray, vy: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Writes the bullets chosen by nearest_indices into `out`, shape (K, NEAREST_BULLET_FEATURES):
+    one row [1, dx, dy, vx, vy] per bullet, closest first, positions relative to the player in
+    units of SCAN_RADIUS and velocities in units of DEFAULT_BULLET_SPEED. Rows without a bullet are 0.
+
+    Returns:
+        np.ndarray: `out`
+    """
+    n = len(dx)
+    out[:n, 0] = 1
+    out[:n, 1] = dx
+    out[:n, 2] = dy
+    out[:n, 1:3] /= SCAN_RADIUS
+    out[:n, 3] = vx
+    out[:n, 4] = vy
+    out[:n, 3:5] /= DEFAULT_BULLET_SPEED
+    out[n:] = 0
+    return out
+
+def near_wall_flags(player_x: np.ndarray, player_y: np.ndarray) -> np.ndarray:
+    """
+    Vectorized Player.get_near_wall_info.
+
+    Returns:
+        np.ndarray: shape (num_players, 4), flags [top, right, bottom, left]
+    """
+    return np.stack((
+        player_y - BOX_TOP < WALL_CLOSE_RANGE,
+        BOX_LEFT + BOX_SIZE - player_x < WALL_CLOSE_RANGE,
+        BOX_TOP + BOX_SIZE - player_y < WALL_CLOSE_RANGE,
+        player_x - BOX_LEFT < WALL_CLOSE_RANGE,
+    ), axis=1)
@@ -0,0 +1,197 @@
+import time
+import numpy as np
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from game.vec_game import VecGame, STATE_SIZE
+
+class SharedBuffers:
+    """
+    Numpy views over one shared memory block, laid out the same way in the learner and in every worker.
+
+    - states: (2, num_envs, STATE_SIZE), rewards, dones: (2, num_envs), two buffers used in turn
+      so the results returned by the previous step stay valid while the next one is written
+    - episode_scores: (num_envs,)
+    - steps, busy_time: (num_workers,) env steps done and seconds spent stepping by each worker
+    """
+
+    def __init__(self, buffer, num_envs: int, num_workers: int):
+        offset = 0
+        for name, dtype, shape in self.fields(num_envs, num_workers):
+            array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            setattr(self, name, array)
+            offset += array.nbytes
+
+    @staticmethod
+    def fields(num_envs: int, num_workers: int) -> list[tuple[str, type, tuple]]:
+        return [
+            ("states", np.float64, (2, num_envs, STATE_SIZE)),
+            ("rewards", np.float64, (2, num_envs)),
+            ("episode_scores", np.int64, (num_envs,)),
+            ("steps", np.int64, (num_workers,)),
+            ("busy_time", np.float64, (num_workers,)),
+            ("dones", np.bool_, (2, num_envs)),
+        ]
+
+    @staticmethod
+    def size(num_envs: int, num_workers: int) -> int:
+        return sum(np.dtype(dtype).itemsize * int(np.prod(shape))
+                   for _, dtype, shape in SharedBuffers.fields(num_envs, num_workers))
+
+def _worker(worker_id: int, envs_per_worker: int, num_workers: int, shm_name: str, conn, seed: int = None):
+    """Own a VecGame of `envs_per_worker` games and step it on request of the learner."""
+    shm = SharedMemory(name=shm_name)
+    shared = SharedBuffers(shm.buf, envs_per_worker * num_workers, num_workers)
+    start = worker_id * envs_per_worker
+    end = start + envs_per_worker
+    game = VecGame(envs_per_worker, None if seed is None else f"{seed}:{worker_id}")
+    actions = np.zeros((envs_per_worker, 9), dtype=np.float64)
+    rows = np.arange(envs_per_worker)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "step":
+                buffer_index, action_indices = data
+                step_start = time.perf_counter()
+                actions.fill(0)
+                actions[rows, action_indices] = 1
+                states, rewards, dones = game.step(actions)
+                shared.states[buffer_index, start:end] = states
+                shared.rewards[buffer_index, start:end] = rewards
+                shared.dones[buffer_index, start:end] = dones
+                shared.episode_scores[start:end] = game.episode_scores
+                shared.steps[worker_id] += envs_per_worker
+                shared.busy_time[worker_id] += time.perf_counter() - step_start
+                conn.send(None)
+            elif command == "reset":
+                shared.states[data, start:end] = game.reset()
+                shared.rewards[data, start:end] = 0
+                shared.dones[data, start:end] = False
+                conn.send(None)
+            elif command == "close":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # các view numpy phải được giải phóng trước khi đóng vùng nhớ chung
+        del shared
+        shm.close()
+        conn.close()
+
+class SubprocVecGame:
+    """
+    Pool of worker processes, each stepping a VecGame of `envs_per_worker` games, to use every core.
+
+    Has the same interface as VecGame (num_envs, reset, step, episode_scores), so the agents'
+    `train_vectorized` works with either. Observations, rewards and done flags are written by the
+    workers into one shared memory block and returned as numpy views without copying; only the
+    action indices and a short acknowledgement go through the per-worker pipes.
+
+    The states, rewards and dones returned by `step` are overwritten by the step after the next
+    one: copy them before keeping them longer (e.g. in a replay memory). `episode_scores` is a
+    single buffer, updated by every step.
+    """
+
+    def __init__(self, num_workers: int = None, envs_per_worker: int = 8, seed: int = None):
+        self.num_workers = num_workers or mp.cpu_count()
+        self.envs_per_worker = envs_per_worker
+        self.num_envs = self.num_workers * envs_per_worker
+        self.buffer_index = 0
+
+        size = SharedBuffers.size(self.num_envs, self.num_workers)
+        self.shm = SharedMemory(create=True, size=size)
+        self.shared = SharedBuffers(self.shm.buf, self.num_envs, self.num_workers)
+        self.shared.steps[:] = 0
+        self.shared.busy_time[:] = 0
+
+        # "spawn" để chạy giống nhau trên Windows và Linux
+        context = mp.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        for worker_id in range(self.num_workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(worker_id, envs_per_worker, self.num_workers, self.shm.name, child_conn, seed),
+                daemon=True)
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+        self.start_time = time.perf_counter()
+        self.closed = False
+
+    @property
+    def episode_scores(self) -> np.ndarray:
+        return self.shared.episode_scores
+
+    def _wait(self):
+        for conn in self.connections:
+            conn.recv()
+
+    def reset(self) -> np.ndarray:
+        self.buffer_index = 0
+        for conn in self.connections:
+            conn.send(("reset", self.buffer_index))
+        self._wait()
+        self.shared.steps[:] = 0
+        self.shared.busy_time[:] = 0
+        self.start_time = time.perf_counter()
+        return self.shared.states[self.buffer_index]
+
+    def step_async(self, actions: np.ndarray):
+        """Send the actions (one-hot, shape (num_envs, 9)) to the workers without waiting."""
+        self.buffer_index ^= 1
+        action_indices = np.argmax(actions, axis=1).astype(np.uint8)
+        for worker_id, conn in enumerate(self.connections):
+            start = worker_id * self.envs_per_worker
+            conn.send(("step", (self.buffer_index, action_indices[start:start + self.envs_per_worker])))
+
+    def step_wait(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self._wait()
+        index = self.buffer_index
+        return self.shared.states[index], self.shared.rewards[index], self.shared.dones[index]
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Same as VecGame.step, the returned arrays are views into the shared memory."""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def get_throughput(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            tuple[np.ndarray, np.ndarray]: per worker, env steps per second
+            - since the last reset (wall clock, includes waiting for the learner)
+            - while stepping only (what the worker could reach with a learner that never waits)
+        """
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        steps = self.shared.steps.astype(np.float64)
+        return steps / elapsed, steps / np.maximum(self.shared.busy_time, 1e-9)
+
+    def print_throughput(self):
+        wall_rates, busy_rates = self.get_throughput()
+        for worker_id, (wall_rate, busy_rate) in enumerate(zip(wall_rates, busy_rates)):
+            print(f"Worker {worker_id}: {wall_rate:,.0f} steps/s ({busy_rate:,.0f} steps/s while stepping)")
+        print(f"Total: {wall_rates.sum():,.0f} steps/s over {self.num_envs} games")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self.connections:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        del self.shared
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,153 @@
+import random
+import numpy as np
+from configs.game_config import UPDATE_DELTA_TIME, CONTINUOUS_COLLISION
+from configs.bot_config import USE_COMPLEX_SCANNING, USE_NEAREST_BULLETS_STATE, NUM_NEAREST_BULLETS
+from game.bullet import BulletStore
+from game.bullet_manager import BulletManager
+from game.collision import swept_distance_square
+from game.player import Player
+from game.state_encoder import (
+    region_indices, near_wall_flags, nearest_indices, encode_nearest,
+    BULLET_STATE_SIZE, NEAREST_BULLET_FEATURES, STATE_SIZE)
+
+class VecGame:
+    """
+    N independent headless games stepped as one batch.
+
+    Every game keeps its own Player and spawn schedule (BulletManager), but all bullets live
+    in one shared BulletStore tagged with their game index, so moving, bouncing, culling,
+    collision and state encoding run once per step for the whole batch instead of once per game.
+
+    A game whose player is hit is reset automatically at the end of `step`: the returned state
+    of that game is already the first state of its next episode, and the score of the finished
+    episode is kept in `episode_scores`.
+    """
+
+    def __init__(self, num_envs: int, seed: int | str = None, update_ticks: int = 1,
+                 continuous_collision: bool = CONTINUOUS_COLLISION):
+        """
+        Args:
+            num_envs: Number of games
+            seed: Seed of the games' random streams (game i uses its own stream derived from seed and i)
+            update_ticks: Number of UPDATE_DELTA_TIME ticks covered by one step (see Simulation)
+            continuous_collision: Swept collision test over the whole step (see Simulation)
+        """
+        self.num_envs = num_envs
+        self.update_ticks = update_ticks
+        self.delta_time = update_ticks * UPDATE_DELTA_TIME
+        self.continuous_collision = continuous_collision
+        self.randoms = [random.Random(None if seed is None else f"{seed}:{env}") for env in range(num_envs)]
+        self.update_counter = 0
+        self.bullets = BulletStore(capacity=1024 * num_envs)
+        self.players = [Player() for _ in range(num_envs)]
+        self.bullet_managers = [BulletManager(player, self.bullets, env_id=i, rng=self.randoms[i]) for i, player in enumerate(self.players)]
+        self.player_radius = np.array([player.radius for player in self.players], dtype=np.float64)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.episode_scores = np.zeros(num_envs, dtype=np.int64)
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        """Restart every game. Returns the stacked states, shape (num_envs, state_size)."""
+        for env in range(self.num_envs):
+            self.reset_env(env)
+        return self.get_state()
+
+    def reset_env(self, env: int):
+        self.players[env].reset()
+        self.bullet_managers[env].reset(self.update_counter)
+        self.scores[env] = 0
+
+    def get_player_positions(self) -> tuple[np.ndarray, np.ndarray]:
+        return (np.array([player.x for player in self.players], dtype=np.float64),
+                np.array([player.y for player in self.players], dtype=np.float64))
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Step every game once.
+
+        Args:
+            actions: One-hot actions, shape (num_envs, 9)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - states: shape (num_envs, state_size), see `get_state`
+            - rewards: shape (num_envs,), same values as Simulation.get_reward
+            - dones: shape (num_envs,), True for the games that ended (and were reset) this step
+        """
+        first_tick = self.update_counter + 1
+        self.update_counter += self.update_ticks
+        start_x, start_y = self.get_player_positions()
+        rewards = np.empty(self.num_envs, dtype=np.float64)
+        for env, (player, bullet_manager) in enumerate(zip(self.players, self.bullet_managers)):
+            player.update(actions[env], self.delta_time)
+            rewards[env] = 0.5 if not player.is_moving else 0.0
+            if bullet_manager.key == 0:
+                bullet_manager.spawn_ticks(first_tick, self.update_counter)
+        self.bullets.update(self.delta_time)
+
+        dones = self.check_collision(start_x, start_y)
+        self.scores += self.update_ticks
+        rewards[dones] = -100.0
+
+        for env in np.flatnonzero(dones).tolist():
+            self.episode_scores[env] = self.scores[env]
+            self.reset_env(env)
+
+        return self.get_state(), rewards, dones
+
+    def check_collision(self, start_x: np.ndarray = None, start_y: np.ndarray = None) -> np.ndarray:
+        """
+        Args:
+            start_x, start_y: Player positions before the step, for the swept test of continuous_collision
+
+        Returns: bool array of shape (num_envs,), True for the games whose player touches a bullet.
+        """
+        bullets = self.bullets
+        n = bullets.size
+        if n == 0:
+            return np.zeros(self.num_envs, dtype=bool)
+        player_x, player_y = self.get_player_positions()
+        env = bullets.env[:n]
+        dx = bullets.x - player_x[env]
+        dy = bullets.y - player_y[env]
+        if self.continuous_collision and start_x is not None:
+            move_x = player_x - start_x
+            move_y = player_y - start_y
+            distance_square = swept_distance_square(dx, dy, bullets.vx, bullets.vy, bullets.bounce_time_x, bullets.bounce_time_y,
+                                                    self.delta_time, move_x[env], move_y[env])
+        else:
+            distance_square = dx ** 2 + dy ** 2
+        touch_distance = bullets.radius + self.player_radius[env]
+        hits = distance_square <= touch_distance * touch_distance
+        return np.bincount(env[hits], minlength=self.num_envs) > 0
+
+    def get_state(self) -> np.ndarray:
+        """
+        Batched Simulation.get_state(is_heuristic=False).
+
+        Returns:
+            np.ndarray: shape (num_envs, STATE_SIZE), row i is the state of game i
+            (N region flags or the K nearest bullets, then the wall flags [top, right, bottom, left])
+        """
+        player_x, player_y = self.get_player_positions()
+        state = np.zeros((self.num_envs, STATE_SIZE), dtype=np.float64)
+
+        bullets = self.bullets
+        env = bullets.env[:bullets.size]
+        dx = bullets.x - player_x[env]
+        dy = bullets.y - player_y[env]
+        if USE_NEAREST_BULLETS_STATE:
+            # gom đạn theo game một lần rồi chọn K viên gần nhất trong từng nhóm
+            order = np.argsort(env, kind="stable")
+            bounds = np.searchsorted(env[order], np.arange(self.num_envs + 1))
+            distance_square = dx * dx + dy * dy
+            for i in range(self.num_envs):
+                group = order[bounds[i]:bounds[i + 1]]
+                nearest = group[nearest_indices(distance_square[group], NUM_NEAREST_BULLETS)]
+                encode_nearest(dx[nearest], dy[nearest], bullets.vx[nearest], bullets.vy[nearest],
+                               state[i, :BULLET_STATE_SIZE].reshape(NUM_NEAREST_BULLETS, NEAREST_BULLET_FEATURES))
+        else:
+            in_range, region = region_indices(dx, dy, USE_COMPLEX_SCANNING)
+            state[env[in_range], region] = 1
+        state[:, BULLET_STATE_SIZE:] = near_wall_flags(player_x, player_y)
+        return state
@@ -87,7 +87,7 @@ if __name__ == "__main__":
             update_time -= update_interval
             first_frame = False
             
-        game.draw(draw_extra=bot_manager.draw_bot_vision)
+        game.render(draw_extra=bot_manager.draw_bot_vision)
         # print("-------------")
         # for i, state in enumerate(game.get_state()):
         #     if state == 1: print(i)
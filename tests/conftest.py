@@ -0,0 +1,7 @@
+import os
+import sys
+
+# chạy headless, import các module từ thư mục gốc của repo
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,27 @@
+import numpy as np
+from configs.game_config import UPDATE_DELTA_TIME
+from game.bullet import BulletStore
+
+def test_bounces_do_not_depend_on_the_update_length():
+    rng = np.random.default_rng(0)
+    volley = (rng.uniform(20, 630, 200), rng.uniform(20, 630, 200), rng.uniform(0, 2 * np.pi, 200), 300.0, 5.0, (255, 255, 255))
+    single, multi = BulletStore(), BulletStore()
+    for store in (single, multi):
+        store.add(*volley, bouncing=True, max_bounces=50)
+    for _ in range(100):
+        for _ in range(4):
+            single.update()
+        multi.update(4 * UPDATE_DELTA_TIME)
+    np.testing.assert_allclose(multi.x, single.x, atol=0.05)
+    np.testing.assert_allclose(multi.y, single.y, atol=0.05)
+    np.testing.assert_array_equal(multi.bounce_count, single.bounce_count)
+
+def test_bullets_spawned_along_an_edge_use_up_their_bounces():
+    # một loạt đạn nảy bắn từ mỗi góc màn hình, có viên bay dọc theo cạnh
+    store = BulletStore()
+    angles = np.linspace(0, 2 * np.pi, 10, endpoint=False)
+    for corner in [(0, 0), (650, 0), (0, 650), (650, 650)]:
+        store.add(*corner, angles, 150.0, 5.0, (255, 255, 255), bouncing=True, max_bounces=5)
+    for _ in range(5000):
+        store.update()
+    assert store.size == 0
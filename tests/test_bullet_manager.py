@@ -0,0 +1,21 @@
+import numpy as np
+from configs.game_config import BULLET_PATTERNS
+from game.emitters import PatternEmitter
+from game.simulation import Simulation
+
+def test_targeted_shot_points_at_player():
+    sim = Simulation(seed=1)
+    manager = sim.bullet_manager
+    manager.bullets.clear()
+    sim.player.x, sim.player.y = 400.0, 250.0
+
+    prop = BULLET_PATTERNS["targeted_shot"]._replace(enable=True, probability=1.0)
+    emitter = PatternEmitter(manager, prop, 0)
+    emitter.fire(emitter.next_tick)
+
+    bullets = manager.bullets
+    assert bullets.size == prop.num_bullets
+    to_player = np.stack((sim.player.x - bullets.x, sim.player.y - bullets.y), axis=1)
+    velocity = np.stack((bullets.vx, bullets.vy), axis=1)
+    cos_angle = (to_player * velocity).sum(axis=1) / (np.linalg.norm(to_player, axis=1) * np.linalg.norm(velocity, axis=1))
+    np.testing.assert_allclose(cos_angle, 1.0, atol=1e-5)
@@ -0,0 +1,33 @@
+import numpy as np
+from game.simulation import Simulation
+from bot.heuristic_dodge import HeuristicDodgeBot
+
+def test_future_danger_counts_bullets_projected_off_screen():
+    sim = Simulation(seed=1)
+    bullets = sim.bullet_manager.bullets
+    bullets.clear()
+    bullets.add(sim.player.x + 80, sim.player.y, np.pi, 150.0, 5, (255, 255, 255))
+    bot = HeuristicDodgeBot(sim)
+
+    scores = bot.predict_future_danger(np.arange(1), future_ticks=5)
+
+    # ở tầm nhìn này viên đạn đã ra khỏi màn hình nhưng vẫn phải được tính (như trước khi có positions_at)
+    future_x = bullets.x[0] + 5 * bullets.vx[0]
+    future_y = bullets.y[0] + 5 * bullets.vy[0]
+    expected = [1 / ((p.x - future_x) ** 2 + (p.y - future_y) ** 2 + 1)
+                for p in map(sim.player.direction_to_position, sim.player.directions)]
+    np.testing.assert_allclose(scores, expected, rtol=1e-5)
+    assert min(scores) > 0
+
+def test_opposite_threat_uses_the_bullets_it_is_given():
+    sim = Simulation(seed=1)
+    bullets = sim.bullet_manager.bullets
+    bullets.clear()
+    bullets.add(sim.player.x + 40, sim.player.y, 0.0, 0.0, 5, (255, 255, 255))
+    bullets.add(sim.player.x, sim.player.y + 40, 0.0, 0.0, 5, (255, 255, 255))
+    bot = HeuristicDodgeBot(sim)
+    in_range = sim.get_state(True)
+
+    # một bản sao hay một phần của các viên trong tầm được phân loại lại, không lấy cờ của observation
+    assert bot.opposite_threat(in_range.copy()) == bot.opposite_threat(in_range, sim.observe().simple_regions()) == 3
+    assert bot.opposite_threat(in_range[:1]) == 4
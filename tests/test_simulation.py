@@ -0,0 +1,28 @@
+import random
+import numpy as np
+import pytest
+from game.simulation import Simulation
+
+def play(seed: int, update_ticks: int, continuous_collision: bool) -> int:
+    """Score at game over, holding each random action for 4 ticks whatever the update length."""
+    sim = Simulation(seed=seed, update_ticks=update_ticks, continuous_collision=continuous_collision)
+    rng = random.Random(seed + 1000)
+    actions = np.eye(9)
+    while not sim.game_over and sim.score < 5000:
+        action = actions[rng.randrange(9)]
+        for _ in range(4 // update_ticks):
+            sim.update(action)
+            if sim.game_over:
+                break
+    return sim.score
+
+def test_swept_updates_die_in_the_same_update_as_single_ticks():
+    # bounces included: every hit of the 1-tick game is caught by the 4-tick update covering it
+    for seed in range(12):
+        one_tick = play(seed, 1, False)
+        assert play(seed, 4, True) == -(-one_tick // 4) * 4, seed
+
+def test_take_action_rejects_repeat_below_one():
+    sim = Simulation(seed=0)
+    with pytest.raises(ValueError):
+        sim.take_action(np.eye(9)[8], repeat=0)
@@ -0,0 +1,30 @@
+import numpy as np
+from bot.deep_learning.vision_input import numpy_agent
+from bot.deep_learning.vision_input.numpy_agent import VisionNumpyAgent
+from game.simulation import Simulation
+from configs.bot_config import FRAME_STACK_DEPTH
+
+def test_replay_memory_frames_survive_ring_wrap(monkeypatch):
+    monkeypatch.setattr(numpy_agent, "MAX_MEMORY", 20)
+    agent = VisionNumpyAgent(Simulation(seed=1), seed=1)
+    agent.set_mode("train")
+    assert agent.memory.maxlen == 20
+
+    # ghi nhiều frame hơn sức chứa của ring, có cả các lần restart (frame trống)
+    for step in range(10 * agent.frames.capacity):
+        current_state = agent.get_state()
+        action = np.zeros(9)
+        action[step % 9] = 1
+        agent.perform_action(action, render=False)
+        next_state = agent.get_state()
+        reward, game_over = agent.get_reward()
+        agent.remember(current_state, action, reward, next_state, game_over)
+        if game_over or step % 37 == 36:
+            agent.restart_game()
+    assert agent.frames.count > agent.frames.capacity
+
+    # mọi transition còn trong memory vẫn đọc được frame
+    for current_state, action, reward, next_state, game_over in agent.memory:
+        for state in (current_state, next_state):
+            assert agent.frames.stack(state).shape == (FRAME_STACK_DEPTH, numpy_agent.IMG_SIZE, numpy_agent.IMG_SIZE)
+    agent.train_long_memory()
@@ -1,9 +1,59 @@
 from math import sin, cos, asin, sqrt, degrees, pi
 from PIL import Image, ImageDraw
+import numpy as np
 import pygame
 from configs.game_config import DrawSectorMethod, DRAW_SECTOR_METHOD
 
-# ...existing code...
+# Hình học của các sector chỉ phụ thuộc vào (bán kính, index, số phần chia): tính một lần,
+# lưu dưới dạng toạ độ tương đối so với tâm, mỗi lần vẽ chỉ cần tịnh tiến tới vị trí player.
+_sector_offsets = {}
+_pil_sector_images = {}
+_overlay_sprites = {}
+
+def complex_sector_offsets(radius: float, index: int, num_angle_divisions: int = 8, num_radius_divisions: int = 3, segments: int = 3) -> np.ndarray:
+    """Vertices of cell `index` of draw_complex_sector relative to the centre, shape (n, 2), computed once."""
+    key = ("complex", radius, index, num_angle_divisions, num_radius_divisions, segments)
+    offsets = _sector_offsets.get(key)
+    if offsets is None:
+        ring_index = index // num_angle_divisions
+        angle_index = index % num_angle_divisions
+        inner_radius = (ring_index * radius) / num_radius_divisions
+        outer_radius = ((ring_index + 1) * radius) / num_radius_divisions
+        sector_angle = 2 * pi / num_angle_divisions
+        from_angle = -sector_angle / 2 + angle_index * sector_angle
+        to_angle = from_angle + sector_angle
+
+        points = []
+        if inner_radius > 0:
+            for i in range(segments + 1):
+                angle = from_angle + (to_angle - from_angle) * (i / segments)
+                points.append((inner_radius * cos(angle), inner_radius * sin(angle)))
+        else: points.append((0.0, 0.0))  # Nếu không có vòng trong, thêm tâm
+        for i in range(segments, -1, -1):
+            angle = from_angle + (to_angle - from_angle) * (i / segments)
+            points.append((outer_radius * cos(angle), outer_radius * sin(angle)))
+        # trục y của màn hình hướng xuống
+        offsets = _sector_offsets[key] = np.array(points, dtype=np.float64) * (1.0, -1.0)
+    return offsets
+
+def sector_offsets(radius: float, index: int, num_sectors: int = 8, segments: int = 5) -> np.ndarray:
+    """Vertices of sector `index` of draw_sector_use_polygon relative to the centre, shape (segments + 2, 2), computed once."""
+    key = ("sector", radius, index, num_sectors, segments)
+    offsets = _sector_offsets.get(key)
+    if offsets is None:
+        from_angle, to_angle = sector_angles(index, num_sectors)
+        points = [(0.0, 0.0)]
+        for i in range(segments + 1):
+            angle = from_angle + (to_angle - from_angle) * (i / segments)
+            points.append((radius * cos(angle), radius * sin(angle)))
+        offsets = _sector_offsets[key] = np.array(points, dtype=np.float64) * (1.0, -1.0)
+    return offsets
+
+def sector_angles(index: int, num_sectors: int = 8) -> tuple[float, float]:
+    """(from_angle, to_angle) in radians of sector `index`, sector 0 centred on angle 0."""
+    sector_angle = 2 * pi / num_sectors  # Góc của mỗi nan quạt
+    from_angle = -sector_angle / 2 + index * sector_angle
+    return from_angle, from_angle + sector_angle
 
 def draw_complex_sector(
     surface: pygame.Surface, point_x: int, point_y: int, index: int,
@@ -21,52 +71,22 @@ def draw_complex_sector(
         color: Màu sắc
         segments: cạnh trên cung tròn (tăng để mượt hơn)
     '''
-    # Xác định phần tử thuộc vòng nào và góc nào
-    ring_index = index // num_angle_divisions  # Chỉ số vòng (0 đến num_radius_divisions-1)
-    angle_index = index % num_angle_divisions   # Chỉ số góc trong vòng (0 đến num_angle_divisions-1)
-    
-    # Tính bán kính trong và ngoài của phần tử
-    inner_radius = (ring_index * radius) / num_radius_divisions
-    outer_radius = ((ring_index + 1) * radius) / num_radius_divisions
-    
-    # Tính góc bắt đầu và kết thúc
-    sector_angle = 2 * pi / num_angle_divisions
-    from_angle = -sector_angle / 2 + angle_index * sector_angle
-    to_angle = from_angle + sector_angle
-    
-    # Tạo các điểm cho polygon
-    points = []
-    
-    # Thêm các điểm ở vòng trong
-    if inner_radius > 0:
-        for i in range(segments + 1):
-            angle = from_angle + (to_angle - from_angle) * (i / segments)
-            x_inner = point_x + inner_radius * cos(angle)
-            y_inner = point_y - inner_radius * sin(angle)
-            points.append((x_inner, y_inner))
-    else: points.append((point_x, point_y))  # Nếu không có vòng trong, thêm tâm
-    
-    # Thêm các điểm ở vòng ngoài
-    for i in range(segments, -1, -1):
-        angle = from_angle + (to_angle - from_angle) * (i / segments)
-        x_outer = point_x + outer_radius * cos(angle)
-        y_outer = point_y - outer_radius * sin(angle)
-        points.append((x_outer, y_outer))
-    
+    # Hình học tính sẵn, tịnh tiến tới tâm
+    points = complex_sector_offsets(radius, index, num_angle_divisions, num_radius_divisions, segments) + (point_x, point_y)
+
     # Vẽ polygon
-    pygame.draw.polygon(surface, color, points)
+    pygame.draw.polygon(surface, color, points.tolist())
 
     # Vẽ viền (tùy chọn)
     # pygame.draw.lines(surface, (0, 0, 0), True, points, 1)
     
 def draw_sector(surface: pygame.Surface, point_x: int, point_y: int, radius: int, index: int, color, num_sectors=8, draw_method = DRAW_SECTOR_METHOD):
-    sector_angle = 2 * pi / num_sectors  # Góc của mỗi nan quạt
-    start_angle = -sector_angle / 2
-    from_angle = start_angle + index * sector_angle
-    to_angle = from_angle + sector_angle
     if draw_method == DrawSectorMethod.USE_POLYGON:
-        draw_sector_use_polygon(surface, point_x, point_y, radius, from_angle, to_angle, color)
+        # hình học tính sẵn theo (bán kính, index, num_sectors)
+        points = sector_offsets(radius, index, num_sectors) + (point_x, point_y)
+        pygame.draw.polygon(surface, color, points.tolist())
         return
+    from_angle, to_angle = sector_angles(index, num_sectors)
     if draw_method == DrawSectorMethod.USE_TRIANGLE:
         # Tính tọa độ hai điểm ngoài cung tròn
         x1 = point_x + radius * cos(from_angle)
@@ -99,19 +119,22 @@ def draw_sector(surface: pygame.Surface, point_x: int, point_y: int, radius: int
         return
     
 def draw_sector_use_PIL(surface: pygame.Surface, point_x: int, point_y: int, radius: int, from_angle:float, to_angle: float, color: tuple):
-    """Vẽ hình quạt (pieslice) bằng PIL rồi chuyển sang pygame."""
-    size = (radius * 2, radius * 2)  # Kích thước ảnh
-    image = Image.new("RGBA", size, (0, 0, 0, 0))  # Ảnh trong suốt
-    draw = ImageDraw.Draw(image)
+    """Vẽ hình quạt (pieslice) bằng PIL rồi chuyển sang pygame (ảnh được lưu lại theo bán kính, góc và màu)."""
+    key = (radius, from_angle, to_angle, tuple(color))
+    pygame_image = _pil_sector_images.get(key)
+    if pygame_image is None:
+        size = (radius * 2, radius * 2)  # Kích thước ảnh
+        image = Image.new("RGBA", size, (0, 0, 0, 0))  # Ảnh trong suốt
+        draw = ImageDraw.Draw(image)
 
-    # Vẽ hình quạt với PIL
-    bbox = (0, 0, size[0], size[1])
-    draw.pieslice(bbox, start=degrees(from_angle), end=degrees(to_angle), fill=color)
+        # Vẽ hình quạt với PIL
+        bbox = (0, 0, size[0], size[1])
+        draw.pieslice(bbox, start=degrees(from_angle), end=degrees(to_angle), fill=color)
 
-    # Chuyển sang pygame
-    mode = image.mode
-    data = image.tobytes()
-    pygame_image = pygame.image.fromstring(data, image.size, mode)
+        # Chuyển sang pygame
+        mode = image.mode
+        data = image.tobytes()
+        pygame_image = _pil_sector_images[key] = pygame.image.fromstring(data, image.size, mode).convert_alpha(surface)
 
     # Blit hình quạt lên surface
     surface.blit(pygame_image, (point_x - radius, point_y - radius))
@@ -135,6 +158,60 @@ def draw_sector_use_polygon(surface: pygame.Surface, point_x: int, point_y: int,
         points.append((x, y))
     pygame.draw.polygon(surface, color, points)  # Vẽ hình quạt
 
+def overlay_sprite(surface: pygame.Surface, key: tuple, radius: float, draw: callable) -> tuple[pygame.Surface, int, int]:
+    """
+    Pre-rendered overlay piece, made once per key: `draw(sprite, cx, cy)` draws it centred on (cx, cy)
+    into a colorkeyed surface in the pixel format of `surface`, cropped to what was drawn.
+
+    Returns:
+        tuple: (sprite, dx, dy), blit it at (int(x) + dx, int(y) + dy) to centre it on (x, y)
+    """
+    sprite = _overlay_sprites.get(key)
+    if sprite is None:
+        center = int(radius) + 1
+        canvas = pygame.Surface((2 * center + 1, 2 * center + 1), 0, surface)
+        colorkey = (0, 0, 0) if key[-1] != (0, 0, 0) else (255, 255, 255)
+        canvas.fill(colorkey)
+        canvas.set_colorkey(colorkey)
+        draw(canvas, center, center)
+        rect = canvas.get_bounding_rect()
+        piece = canvas.subsurface(rect).copy()
+        piece.set_colorkey(colorkey, pygame.RLEACCEL)
+        sprite = _overlay_sprites[key] = (piece, rect.x - center, rect.y - center)
+    return sprite
+
+def blit_complex_sectors(surface: pygame.Surface, point_x: float, point_y: float, flags, radius: float,
+                         num_angle_divisions: int = 8, num_radius_divisions: int = 3, color: tuple = (255, 255, 0)):
+    """
+    Draw every flagged cell of the num_angle_divisions x num_radius_divisions overlay around (point_x, point_y)
+    with one Surface.blits of cached cell sprites (same cells as draw_complex_sector, snapped to whole pixels).
+    """
+    color = tuple(color)
+    x, y = int(point_x), int(point_y)
+    blits = []
+    for index in np.flatnonzero(flags).tolist():
+        sprite, dx, dy = overlay_sprite(
+            surface, ("complex", radius, index, num_angle_divisions, num_radius_divisions, color), radius,
+            lambda canvas, cx, cy, index=index: draw_complex_sector(canvas, cx, cy, index, radius, num_angle_divisions, num_radius_divisions, color))
+        blits.append((sprite, (x + dx, y + dy)))
+    surface.blits(blits, doreturn=False)
+
+def blit_sectors(surface: pygame.Surface, point_x: float, point_y: float, flags, radius: int, color: tuple,
+                 num_sectors: int = 8, draw_method = DRAW_SECTOR_METHOD):
+    """
+    Draw every flagged sector around (point_x, point_y) with one Surface.blits of cached sector sprites
+    (same sectors as draw_sector, snapped to whole pixels).
+    """
+    color = tuple(color)
+    x, y = int(point_x), int(point_y)
+    blits = []
+    for index in np.flatnonzero(flags).tolist():
+        sprite, dx, dy = overlay_sprite(
+            surface, ("sector", radius, index, num_sectors, draw_method, color), radius,
+            lambda canvas, cx, cy, index=index: draw_sector(canvas, cx, cy, radius, index, color, num_sectors, draw_method))
+        blits.append((sprite, (x + dx, y + dy)))
+    surface.blits(blits, doreturn=False)
+
 def rotate_point(px, py, cx, cy, angle):
         """Xoay điểm (px, py) quanh tâm (cx, cy) một góc angle (radian)."""
         cos_theta = cos(angle)
@@ -148,23 +225,51 @@ def draw_water_drop(surface: pygame.Surface, object: object):
     if len(object.trail) < 2:
         return  # Không đủ điểm để vẽ
 
-    P_tail = object.trail[0]  # Đít của giọt nước
+    draw_water_drop_at(surface, object.x, object.y, object.radius, object.color, object.trail[0])
 
+def draw_water_drop_at(surface: pygame.Surface, x: float, y: float, radius: float, color: tuple, P_tail: tuple) -> pygame.Rect:
+    """Vẽ giọt nước từ đuôi P_tail (vị trí cũ nhất của vệt) tới vật thể ở (x, y). Trả về vùng đã vẽ (None nếu không vẽ)."""
     # Tính khoảng cách d
-    dx, dy = object.x - P_tail[0], object.y - P_tail[1]
+    dx, dy = x - P_tail[0], y - P_tail[1]
     d = sqrt(dx**2 + dy**2)
-    mid_point_x = (object.x + P_tail[0])/2
-    mid_point_y = (object.y + P_tail[1])/2
+    mid_point_x = (x + P_tail[0])/2
+    mid_point_y = (y + P_tail[1])/2
 
-    if d <= object.radius:
+    if d <= radius:
         return  # Tránh lỗi chia 0 khi d quá nhỏ
 
-    theta = 2 * asin(object.radius / d)
+    theta = 2 * asin(radius / d)
 
     # Quay P_head quanh P_tail góc ±theta/2
-    T1 = rotate_point(object.x, object.y, mid_point_x, mid_point_y, theta)
-    T2 = rotate_point(object.x, object.y, mid_point_x, mid_point_y, -theta)
+    T1 = rotate_point(x, y, mid_point_x, mid_point_y, theta)
+    T2 = rotate_point(x, y, mid_point_x, mid_point_y, -theta)
     
-    trail_color = tuple(c * 0.5 for c in object.color)
+    trail_color = tuple(c * 0.5 for c in color)
+
+    return pygame.draw.polygon(surface, trail_color, [P_tail, T1, T2])
+
+def water_drop_polygons(x: np.ndarray, y: np.ndarray, radius: np.ndarray, tail_x: np.ndarray, tail_y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized draw_water_drop_at geometry for many objects at once.
+
+    Returns:
+        (drawn, points): indices of the objects far enough from their tail to get a drop, and the
+        triangles [P_tail, T1, T2] of those objects, shape (len(drawn), 3, 2)
+    """
+    dx, dy = x - tail_x, y - tail_y
+    d = np.sqrt(dx * dx + dy * dy)
+    drawn = np.flatnonzero(d > radius)
+    x, y, tail_x, tail_y = x[drawn], y[drawn], tail_x[drawn], tail_y[drawn]
+    theta = 2 * np.arcsin(radius[drawn] / d[drawn])
 
-    pygame.draw.polygon(surface, trail_color, [P_tail, T1, T2])
\ No newline at end of file
+    # Quay P_head quanh trung điểm góc ±theta (như rotate_point)
+    half_dx, half_dy = (x - tail_x) / 2, (y - tail_y) / 2
+    mid_x, mid_y = tail_x + half_dx, tail_y + half_dy
+    cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+    points = np.empty((len(drawn), 3, 2))
+    points[:, 0, 0], points[:, 0, 1] = tail_x, tail_y
+    points[:, 1, 0] = mid_x + half_dx * cos_theta - half_dy * sin_theta
+    points[:, 1, 1] = mid_y + half_dx * sin_theta + half_dy * cos_theta
+    points[:, 2, 0] = mid_x + half_dx * cos_theta + half_dy * sin_theta
+    points[:, 2, 1] = mid_y - half_dx * sin_theta + half_dy * cos_theta
+    return drawn, points